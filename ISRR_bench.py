@@ -0,0 +1,232 @@
+# Scaling benchmark for the Multi-Issue Processor Simulator
+
+"""
+Program to benchmark the schedulers of ISRR_simulator.py on synthetic traces of growing size.
+
+For every engine, processor mode, trace length and number of functional units, the benchmark
+reports the simulation time, the instructions simulated per second and the peak memory
+(measured with tracemalloc in a separate run, so it does not slow down the timed one).
+Each configuration is run in a loop long enough to last at least --min-time seconds, so short
+runs are not lost in the timer resolution, and the best of --repeat loops is kept.
+
+The results can be saved as a JSON baseline and compared with a later run to catch
+performance regressions: a configuration is reported when its instructions per second drop
+by more than the tolerance and its time grows by more than the noise floor, in the run and again
+when it is timed once more, and the program exits with status 1.
+
+Usage:
+    python ISRR_bench.py --sizes 100 1000 10000 --units 1 4 --save baseline.json
+    python ISRR_bench.py --sizes 100 1000 10000 --units 1 4 --baseline baseline.json
+"""
+import argparse
+import functools
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from ISRR_simulator import ENGINES, ENGINE_CYCLE, ENGINE_EVENT, MODES, NUM_REGISTERS, ParsedTrace, simulate
+from ISRR_tracegen import generate_trace
+
+# Function to call run loops times in a row, returns its last result and the elapsed time in seconds
+# The garbage collector is off while timing, as in timeit, so that its pauses don't land in some loops only
+def time_loops(run, loops):
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for l in range(loops):
+            result = run()
+        elapsed = time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+    
+    return result, elapsed
+
+# Function to find how many calls of run make a loop of at least min_time seconds, doubling them as needed
+# Returns the last result of run, the number of calls and the time of one call in seconds
+def autorange(run, min_time):
+    loops = 1
+    result, elapsed = time_loops(run, loops)
+    while elapsed < min_time:
+        loops *= 2
+        result, elapsed = time_loops(run, loops)
+    
+    return result, loops, elapsed / loops
+
+# Function to time several functions, returns the last result of each one and its best time per call in seconds
+# The loops found by autorange are the first round, then the functions are timed in repeat - 1 more rounds so
+# that a slow spell of the machine does not fall on every loop of the same function
+def time_rounds(runs, repeat=5, min_time=0.1):
+    timings = [autorange(run, min_time) for run in runs]
+    best = [seconds for result, loops, seconds in timings]
+    
+    for r in range(repeat - 1):
+        for i, run in enumerate(runs):
+            result, elapsed = time_loops(run, timings[i][1])
+            best[i] = min(best[i], elapsed / timings[i][1])
+    
+    return [result for result, loops, seconds in timings], best
+
+# Function to measure the peak memory of one configuration in megabytes
+def measure_memory(trace, mode, num_units, engine):
+    tracemalloc.start()
+    try:
+        simulate(trace, mode, num_units, engine=engine)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return peak / 1e6
+
+# Function to run the benchmark, returns a list with one dictionary per configuration
+def run_benchmark(sizes, units, modes=MODES, engines=(ENGINE_CYCLE, ENGINE_EVENT), seed=0, num_registers=NUM_REGISTERS,
+                  dependency_distance=4, repeat=5, min_time=0.1, memory=True, verbose=True):
+    results = []
+    
+    for size in sizes:
+        
+        # Generate each trace once, the same trace is used for every configuration
+        trace = ParsedTrace(generate_trace(size, seed, num_registers=num_registers, dependency_distance=dependency_distance))
+        
+        # Time the configurations of the trace together
+        configurations = [(engine, mode, num_units) for engine in engines for mode in modes for num_units in units]
+        runs = [functools.partial(simulate, trace, mode, num_units, engine=engine) for engine, mode, num_units in configurations]
+        outcomes, best = time_rounds(runs, repeat, min_time)
+        
+        for c, (engine, mode, num_units) in enumerate(configurations):
+            result = {
+                'engine': engine,
+                'mode': mode,
+                'size': size,
+                'units': num_units,
+                'cycles': outcomes[c].cycles,
+                'seconds': best[c],
+                'instructions_per_second': size / best[c] if best[c] > 0 else float('inf'),
+                'peak_memory_mb': measure_memory(trace, mode, num_units, engine) if memory else None,
+            }
+            results.append(result)
+            
+            if verbose:
+                print_result(result)
+    
+    return results
+
+# Function to print the header of the results
+def print_header():
+    print(f"{'Engine':<7} {'Mode':<24} {'Size':>9} {'Units':>5} {'Cycles':>9} {'Seconds':>9} {'Instr/s':>11} {'Peak MB':>8}")
+
+# Function to print the result of one configuration
+def print_result(result):
+    memory = '' if result['peak_memory_mb'] is None else f"{result['peak_memory_mb']:.3f}"
+    print(f"{result['engine']:<7} {result['mode']:<24} {result['size']:>9} {result['units']:>5} {result['cycles']:>9} "
+          f"{result['seconds']:>9.4f} {result['instructions_per_second']:>11.0f} {memory:>8}")
+
+# Function to compare the results with a baseline, returns the configurations that got slower than the tolerance
+# A slowdown of less than noise_floor seconds per run is ignored, since it is within the noise of the timer
+# and the machine. Also reports the configurations whose simulated cycles changed, since then the timings
+# are not comparable
+def compare_with_baseline(results, baseline, tolerance=0.2, noise_floor=0.001):
+    previous = {(b['engine'], b['mode'], b['size'], b['units']): b for b in baseline['results']}
+    regressions = []
+    
+    for result in results:
+        key = (result['engine'], result['mode'], result['size'], result['units'])
+        if key not in previous:
+            continue
+        
+        if result['cycles'] != previous[key]['cycles']:
+            regressions.append((result, previous[key], "simulated cycles changed"))
+        elif (result['instructions_per_second'] < (1 - tolerance) * previous[key]['instructions_per_second']
+              and result['seconds'] - previous[key]['seconds'] > noise_floor):
+            regressions.append((result, previous[key], "slower"))
+    
+    return regressions
+
+# Function to time again the configurations that got slower than the baseline, keeping their best time, so that
+# a configuration is only a regression if it is slower in both timings
+def retime_regressions(regressions, seed=0, num_registers=NUM_REGISTERS, dependency_distance=4, repeat=5, min_time=0.1):
+    traces = {}
+    for result, previous, reason in regressions:
+        if reason != "slower":
+            continue
+        
+        size = result['size']
+        if size not in traces:
+            traces[size] = ParsedTrace(generate_trace(size, seed, num_registers=num_registers, dependency_distance=dependency_distance))
+        run = functools.partial(simulate, traces[size], result['mode'], result['units'], engine=result['engine'])
+        outcomes, (seconds,) = time_rounds([run], repeat, min_time)
+        if seconds < result['seconds']:
+            result['seconds'] = seconds
+            result['instructions_per_second'] = size / seconds if seconds > 0 else float('inf')
+
+# Function to parse the command line arguments
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the Multi-Issue Processor Simulator schedulers on synthetic traces.")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000, 10000], help="trace lengths (default: 100 1000 10000)")
+    parser.add_argument('--units', nargs='+', type=int, default=[1, 4], help="numbers of parallel functional units (default: 1 4)")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help="processor modes (default: all)")
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=[ENGINE_CYCLE, ENGINE_EVENT], help="scheduling engines (default: cycle event)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the traces (default: 0)")
+    parser.add_argument('--registers', type=int, default=NUM_REGISTERS, help=f"number of registers of the traces (default: {NUM_REGISTERS})")
+    parser.add_argument('--distance', type=float, default=4, help="average dependency distance of the traces (default: 4)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed loops of each configuration, the best one is kept (default: 5)")
+    parser.add_argument('--min-time', type=float, default=0.1, help="minimum duration of a timed loop in seconds (default: 0.1)")
+    parser.add_argument('--no-memory', action='store_true', help="don't measure the peak memory")
+    parser.add_argument('--save', help="save the results as a JSON baseline")
+    parser.add_argument('--baseline', help="compare the results with a JSON baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed drop of instructions per second (default: 0.2)")
+    parser.add_argument('--noise-floor', type=float, default=0.001,
+                        help="slowdowns of less than this many seconds per run are not regressions (default: 0.001)")
+    
+    args = parser.parse_args(argv)
+    if any(size < 1 for size in args.sizes):
+        parser.error("the trace lengths must be at least 1")
+    if any(num_units < 1 for num_units in args.units):
+        parser.error("the number of functional units must be at least 1")
+    if args.repeat < 1:
+        parser.error("the number of timed loops must be at least 1")
+    if args.min_time < 0:
+        parser.error("the minimum duration of a loop cannot be negative")
+    if args.noise_floor < 0:
+        parser.error("the noise floor cannot be negative")
+    
+    return args
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    
+    print_header()
+    results = run_benchmark(args.sizes, args.units, args.modes, args.engines, args.seed, args.registers,
+                            args.distance, args.repeat, args.min_time, not args.no_memory)
+    
+    # Save the results with the settings used to generate the traces
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'seed': args.seed, 'registers': args.registers, 'distance': args.distance, 'results': results}, file, indent=2)
+    
+    # Compare the results with the baseline
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+        
+        if (baseline.get('seed'), baseline.get('registers'), baseline.get('distance')) != (args.seed, args.registers, args.distance):
+            print("Warning: the baseline was run on traces generated with other settings")
+        
+        # Time the configurations that look slower once more before reporting them
+        regressions = compare_with_baseline(results, baseline, args.tolerance, args.noise_floor)
+        if regressions:
+            retime_regressions(regressions, args.seed, args.registers, args.distance, args.repeat, args.min_time)
+            regressions = compare_with_baseline(results, baseline, args.tolerance, args.noise_floor)
+        for result, previous, reason in regressions:
+            print(f"Regression ({reason}): {result['engine']} {result['mode']} size {result['size']} units {result['units']}: "
+                  f"{result['instructions_per_second']:.0f} instr/s, baseline {previous['instructions_per_second']:.0f} instr/s")
+        
+        if regressions:
+            sys.exit(1)
+        print("No regressions")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# Result cache for the Multi-Issue Processor Simulator
+
+"""
+Persistent cache of simulation results, stored in a local SQLite database.
+
+Each entry is keyed by a hash of the parsed trace contents and the full scheduler
+configuration (see cache_key in ISRR_simulator.py), so a different trace, latency,
+setting or engine version never hits an old entry. An entry holds the summary of the
+run and, optionally, the compact event log needed to rebuild the table of every cycle.
+
+The database is capped in size: when an entry is stored and the cap is exceeded, the
+least recently used entries are evicted.
+
+Usage:
+    from ISRR_cache import ResultCache
+    from ISRR_simulator import simulate
+    
+    cache = ResultCache('results.sqlite', max_bytes=100 * 1024 * 1024)
+    result = simulate('input_1.txt', 'ooo_retirement', 2, cache=cache)
+"""
+import json
+import sqlite3
+import time
+
+# Default size cap of the cache (bytes)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Result cache in an SQLite database
+class ResultCache:
+    
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        if max_bytes < 0:
+            raise ValueError("The size of the cache can't be negative")
+        
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        
+        # Several processes can share the database, wait for the others instead of failing
+        self.connection = sqlite3.connect(path, timeout=30)
+        with self.connection:
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                events BLOB,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL)""")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+    
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exception):
+        self.close()
+    
+    def close(self):
+        self.connection.close()
+    
+    # Get an entry, returns (summary dictionary, event log or None), or None if it is not cached
+    # With events=True, entries saved without their event log count as missing
+    def get(self, key, events=False):
+        row = self.connection.execute("SELECT summary, events FROM results WHERE key = ?", (key,)).fetchone()
+        
+        if row is None or (events and row[1] is None):
+            self.misses += 1
+            return None
+        
+        # Mark the entry as recently used
+        with self.connection:
+            self.connection.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        
+        self.hits += 1
+        return json.loads(row[0]), row[1]
+    
+    # Save an entry, replacing the previous one, and evict the least recently used entries above the size cap
+    def put(self, key, summary, events=None):
+        summary = json.dumps(summary)
+        size = len(key) + len(summary) + (len(events) if events is not None else 0)
+        
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO results (key, summary, events, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                                    (key, summary, events, size, time.time()))
+            self.evict()
+    
+    # Delete the least recently used entries until the cache fits in its size cap
+    def evict(self):
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        
+        for key, size in self.connection.execute("SELECT key, size FROM results ORDER BY last_used").fetchall():
+            self.connection.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+    
+    # Get the total size of the entries (bytes)
+    def size(self):
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+    
+    # Delete all the entries
+    def clear(self):
+        with self.connection:
+            self.connection.execute("DELETE FROM results")
@@ -0,0 +1,47 @@
+# Binary trace converter for the Multi-Issue Processor Simulator
+
+"""
+Program to convert input files of ISRR_simulator.py from the text format:
+    
+    <destination register>,<source register 1>,<source register 2>,<operation>
+
+to the compact binary format (see write_binary_trace in ISRR_simulator.py): a header with
+the number of registers, the number of instructions and the latency of each operation,
+followed by one fixed-width record per instruction.
+
+Binary traces are memory-mapped when they are read, so nothing is parsed on later runs.
+The simulator recognizes them by their header, they can be used wherever a text input
+file is accepted.
+
+Usage:
+    python ISRR_convert.py trace.txt trace.bin
+    python ISRR_simulator.py trace.bin --modes ooo_retirement --units 4
+"""
+import argparse
+import time
+
+from ISRR_simulator import convert_trace, is_binary_trace
+
+# Function to parse the command line arguments
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description="Convert a trace of the Multi-Issue Processor Simulator to the binary format.")
+    parser.add_argument('input', help="text input file with one instruction per line (rD,rS1,rS2,op)")
+    parser.add_argument('output', help="binary trace file to write")
+    
+    args = parser.parse_args(argv)
+    if is_binary_trace(args.input):
+        parser.error(f"{args.input} is already a binary trace")
+    if args.input == args.output:
+        parser.error("the output file must be different from the input file")
+    
+    return args
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    
+    start = time.perf_counter()
+    num_instructions = convert_trace(args.input, args.output)
+    print(f"Converted {num_instructions} instructions to {args.output} in {time.perf_counter() - start:.2f} s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+# Differential fuzzing harness for the Multi-Issue Processor Simulator
+
+"""
+Program to check that the fast scheduling engines of ISRR_simulator.py produce exactly the same
+schedules as the reference cycle-by-cycle schedulers (in_order_execution,
+out_of_order_issue_in_order_retirement and out_of_order_issue_and_retirement).
+
+Each case is a random or edge-case trace with a random configuration (mode, number of functional
+units, reorder buffer and issue window sizes). The trace kinds are:
+    o	random: ISRR_tracegen traces with a random length, operation mix, register count and
+        dependency distance
+    o	collide: every instruction reads and writes the same register
+    o	load_chain: long chains of Loads, each one reading the destination of the previous one
+    o	wide: a few instructions on more functional units than instructions
+    o	empty: no instructions at all
+
+The reference and every candidate engine run side by side on the same case, and their issue and
+retire cycles are compared instruction by instruction. A mismatch is shrunk to a minimal trace and
+configuration that still reproduce it, and can be saved as an input file. At the end, the speedup
+of each candidate over the reference on the same cases is reported, and the program exits with
+status 1 if any mismatch was found.
+
+Usage:
+    python ISRR_fuzz.py --cases 1000 --seed 1 --candidates event batch --save-failures failures
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from ISRR_simulator import (EVENT_ISSUE, ENGINE_BATCH, ENGINE_CYCLE, ENGINE_EVENT, MODE_IN_ORDER, MODE_OOO_IN_ORDER_RETIREMENT,
+                            MODES, NUM_REGISTERS, Instruction, Opcode, ParsedTrace, simulate)
+from ISRR_tracegen import format_line, generate_trace
+
+# Kinds of generated traces
+TRACE_RANDOM = 'random'
+TRACE_COLLIDE = 'collide'
+TRACE_LOAD_CHAIN = 'load_chain'
+TRACE_WIDE = 'wide'
+TRACE_EMPTY = 'empty'
+TRACE_KINDS = (TRACE_RANDOM, TRACE_COLLIDE, TRACE_LOAD_CHAIN, TRACE_WIDE, TRACE_EMPTY)
+
+# Engines compared with the reference
+CANDIDATES = (ENGINE_EVENT, ENGINE_BATCH)
+
+# Case of the fuzzer: trace and configuration
+# rob_size is only set for out-of-order issue, in-order retirement, and issue_window for the out-of-order modes,
+# the only settings the reference schedulers support.
+class FuzzCase:
+    
+    def __init__(self, kind, instructions, mode, num_units, rob_size=None, issue_window=None):
+        self.kind = kind
+        self.instructions = instructions
+        self.mode = mode
+        self.num_units = num_units
+        self.rob_size = rob_size
+        self.issue_window = issue_window
+    
+    def __repr__(self):
+        return (f"FuzzCase({self.kind}, {len(self.instructions)} instructions, mode={self.mode}, units={self.num_units}, "
+                f"rob_size={self.rob_size}, issue_window={self.issue_window})")
+    
+    # Copy of the case with other instructions or settings
+    def replace(self, **changes):
+        settings = {'kind': self.kind, 'instructions': self.instructions, 'mode': self.mode, 'num_units': self.num_units,
+                    'rob_size': self.rob_size, 'issue_window': self.issue_window}
+        settings.update(changes)
+        return FuzzCase(**settings)
+
+# Function to generate the instructions of a trace of the given kind
+def generate_instructions(kind, rng):
+    if kind == TRACE_RANDOM:
+        mix = {symbol: rng.randint(0, 3) for symbol in ('+', '-', '*', 'Load', 'Store')}
+        if not any(mix.values()):
+            mix['+'] = 1
+        return list(generate_trace(rng.randint(1, 200), rng.randrange(2**32), mix, rng.randint(1, NUM_REGISTERS),
+                                   rng.choice((0, 1, 2, 4, 8))))
+    
+    if kind == TRACE_COLLIDE:
+        register = rng.randrange(NUM_REGISTERS)
+        return [Instruction(register, register, register, rng.choice(list(Opcode))) for k in range(rng.randint(1, 50))]
+    
+    if kind == TRACE_LOAD_CHAIN:
+        
+        # Chains of Loads through one register, with a few other operations in between
+        instructions = []
+        register = rng.randrange(NUM_REGISTERS)
+        for k in range(rng.randint(1, 100)):
+            if rng.random() < 0.1:
+                instructions.append(Instruction(rng.randrange(NUM_REGISTERS), rng.randrange(NUM_REGISTERS), rng.randrange(NUM_REGISTERS),
+                                                rng.choice(list(Opcode))))
+            else:
+                instructions.append(Instruction(register, register, rng.randrange(NUM_REGISTERS), Opcode.LOAD))
+        return instructions
+    
+    if kind == TRACE_EMPTY:
+        return []
+    
+    return list(generate_trace(rng.randint(1, 8), rng.randrange(2**32), num_registers=rng.randint(1, NUM_REGISTERS),
+                               dependency_distance=rng.choice((0, 1, 2))))
+
+# Function to generate a case with a random configuration
+def generate_case(rng, kinds=TRACE_KINDS):
+    kind = rng.choice(kinds)
+    instructions = generate_instructions(kind, rng)
+    mode = rng.choice(MODES)
+    num_units = len(instructions) + rng.randint(1, 4) if kind == TRACE_WIDE else rng.randint(1, 8)
+    
+    rob_size = issue_window = None
+    if mode == MODE_OOO_IN_ORDER_RETIREMENT and rng.random() < 0.5:
+        rob_size = rng.randint(1, len(instructions) + 2)
+    if mode != MODE_IN_ORDER and rng.random() < 0.3:
+        issue_window = rng.randint(1, 8)
+    
+    return FuzzCase(kind, instructions, mode, num_units, rob_size, issue_window)
+
+# Function to check if a candidate engine supports the configuration of a case
+def supports(engine, case):
+    return not (engine == ENGINE_BATCH and case.issue_window is not None)
+
+# Function to run a case on an engine, returns the schedule (number of cycles, issue cycles and retire cycles of
+# the instructions) and the elapsed time in seconds
+def run_case(case, engine):
+    trace = ParsedTrace(case.instructions)
+    start = time.perf_counter()
+    result = simulate(trace, case.mode, case.num_units, case.rob_size, engine, issue_window=case.issue_window)
+    elapsed = time.perf_counter() - start
+    
+    issue_cycles = [None] * len(trace)
+    retire_cycles = [None] * len(trace)
+    events = result.trace
+    for e in range(events.size):
+        if events.kinds[e] == EVENT_ISSUE:
+            issue_cycles[events.instructions[e]] = events.cycles[e]
+        else:
+            retire_cycles[events.instructions[e]] = events.cycles[e]
+    
+    return (result.cycles, issue_cycles, retire_cycles), elapsed
+
+# Function to run a case on the reference and on a candidate, returns a description of the first difference,
+# or None if the schedules are the same. Errors of the candidate count as differences.
+def compare(case, engine):
+    expected = run_case(case, ENGINE_CYCLE)[0]
+    try:
+        actual = run_case(case, engine)[0]
+    except Exception as error:
+        return f"{engine} engine failed: {type(error).__name__}: {error}"
+    
+    for k in range(len(case.instructions)):
+        if (expected[1][k], expected[2][k]) != (actual[1][k], actual[2][k]):
+            return (f"instruction {k + 1}: reference issues at {expected[1][k]} and retires at {expected[2][k]}, "
+                    f"{engine} engine issues at {actual[1][k]} and retires at {actual[2][k]}")
+    if expected[0] != actual[0]:
+        return f"reference takes {expected[0]} cycles, {engine} engine {actual[0]} cycles"
+    return None
+
+# Function to shrink a case that fails on a candidate to a minimal case that still fails
+# First removes chunks of instructions (the whole trace, then halving the chunk size down to single instructions), then simplifies
+# the remaining instructions (Adds on register 0) and the configuration, until nothing more can be removed.
+def shrink_case(case, engine):
+    
+    def fails(candidate):
+        return supports(engine, candidate) and compare(candidate, engine) is not None
+    
+    changed = True
+    while changed:
+        changed = False
+        
+        # Remove chunks of instructions, down to the whole trace
+        chunk = len(case.instructions)
+        while chunk >= 1:
+            start = 0
+            while start < len(case.instructions):
+                instructions = case.instructions[:start] + case.instructions[start + chunk:]
+                if fails(case.replace(instructions=instructions)):
+                    case = case.replace(instructions=instructions)
+                    changed = True
+                else:
+                    start += chunk
+            chunk //= 2
+        
+        # Simplify the instructions one field at a time, each change applies on top of the ones kept before
+        for k in range(len(case.instructions)):
+            for field in ('opcode', 'destination', 'source_1', 'source_2'):
+                instruction = case.instructions[k]
+                fields = {'destination': instruction.destination, 'source_1': instruction.source_1, 'source_2': instruction.source_2,
+                          'opcode': instruction.opcode}
+                fields[field] = Opcode.ADD if field == 'opcode' else 0
+                candidate = Instruction(**fields)
+                if candidate == instruction:
+                    continue
+                instructions = case.instructions[:k] + [candidate] + case.instructions[k + 1:]
+                if fails(case.replace(instructions=instructions)):
+                    case = case.replace(instructions=instructions)
+                    changed = True
+        
+        # Simplify the configuration: fewer units, and no reorder buffer or issue window limit, or a smaller one
+        for name, simplest in (('num_units', 1), ('rob_size', None), ('issue_window', None)):
+            for value in (simplest, None if getattr(case, name) is None else getattr(case, name) - 1):
+                if value == getattr(case, name) or value is not None and value < 1:
+                    continue
+                if fails(case.replace(**{name: value})):
+                    case = case.replace(**{name: value})
+                    changed = True
+    
+    return case
+
+# Function to save a case as an input file, returns its name
+def save_case(case, engine, directory, number):
+    os.makedirs(directory, exist_ok=True)
+    filename = os.path.join(directory, f"failure_{number}_{engine}_{case.mode}_units{case.num_units}.txt")
+    with open(filename, 'w') as file:
+        for instruction in case.instructions:
+            file.write(format_line(instruction) + '\n')
+    return filename
+
+# Function to run the fuzzer, returns the failures (engine, shrunk case, difference) and the total time
+# of the reference and each candidate in seconds
+def run_fuzzer(num_cases, seed=0, candidates=CANDIDATES, kinds=TRACE_KINDS, shrink=True, verbose=True):
+    rng = random.Random(seed)
+    failures = []
+    times = {engine: [0.0, 0.0] for engine in candidates}
+    
+    for c in range(num_cases):
+        case = generate_case(rng, kinds)
+        expected, reference_time = run_case(case, ENGINE_CYCLE)
+        
+        for engine in candidates:
+            if not supports(engine, case):
+                continue
+            
+            try:
+                actual, candidate_time = run_case(case, engine)
+            except Exception:
+                actual, candidate_time = None, 0.0
+            times[engine][0] += reference_time
+            times[engine][1] += candidate_time
+            
+            if actual == expected:
+                continue
+            
+            if shrink:
+                case_failed = shrink_case(case, engine)
+            else:
+                case_failed = case
+            failures.append((engine, case_failed, compare(case_failed, engine)))
+            if verbose:
+                print(f"Case {c + 1}: {engine} engine differs from the reference on {case}")
+                print_failure(*failures[-1])
+    
+    return failures, times
+
+# Function to print a failure with its minimal trace
+def print_failure(engine, case, difference):
+    print(f"  Minimal case: {case}")
+    print(f"  {difference}")
+    for instruction in case.instructions:
+        print(f"    {format_line(instruction)}")
+
+# Function to print the speedup of the candidates over the reference
+def print_speedups(times):
+    print(f"{'Engine':<7} {'Reference s':>12} {'Engine s':>10} {'Speedup':>8}")
+    for engine, (reference_time, candidate_time) in times.items():
+        speedup = reference_time / candidate_time if candidate_time > 0 else float('inf')
+        print(f"{engine:<7} {reference_time:>12.4f} {candidate_time:>10.4f} {speedup:>7.2f}x")
+
+# Function to parse the command line arguments
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description="Compare the fast scheduling engines with the reference schedulers on random traces.")
+    parser.add_argument('--cases', type=int, default=500, help="number of generated cases (default: 500)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the cases (default: 0)")
+    parser.add_argument('--candidates', nargs='+', choices=CANDIDATES, default=list(CANDIDATES), help="engines to check (default: event batch)")
+    parser.add_argument('--kinds', nargs='+', choices=TRACE_KINDS, default=list(TRACE_KINDS), help="kinds of traces (default: all)")
+    parser.add_argument('--no-shrink', action='store_true', help="report the failing cases without shrinking them")
+    parser.add_argument('--save-failures', help="directory to save the minimal failing traces in")
+    
+    args = parser.parse_args(argv)
+    if args.cases < 1:
+        parser.error("the number of cases must be at least 1")
+    
+    return args
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    
+    failures, times = run_fuzzer(args.cases, args.seed, args.candidates, args.kinds, not args.no_shrink)
+    
+    if args.save_failures:
+        for number, (engine, case, difference) in enumerate(failures, 1):
+            print(f"Saved {save_case(case, engine, args.save_failures, number)}")
+    
+    print_speedups(times)
+    if failures:
+        print(f"{len(failures)} mismatches in {args.cases} cases")
+        sys.exit(1)
+    print(f"No mismatches in {args.cases} cases")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+# Simulation service for the Multi-Issue Processor Simulator
+
+"""
+Long-running local service that runs simulations of ISRR_simulator.py on demand.
+
+Clients send a trace (the path of an input file on this machine, or the instructions as text)
+and a scheduler configuration over HTTP on localhost. Each request becomes a job in a queue,
+run by a pool of worker processes around simulate. The workers keep the parsed traces of the
+latest jobs in memory, so repeated jobs on the same trace skip the parsing, and nothing pays
+the interpreter or pandas startup again.
+
+Endpoints (JSON bodies and responses):
+    POST   /jobs        submit a job, returns its id
+                        {"trace": "input_1.txt" or "instructions": "r3,r0,r1,*\\n...",
+                         "mode": "ooo_retirement", "units": 2, "rob_size": null, "engine": "event",
+                         "physical_registers": null, "issue_window": null, "unit_pools": "alu:2,mul:1",
+                         "count_stalls": false, "timeline": false}
+    GET    /jobs        list the jobs and their state
+    GET    /jobs/<id>   state of a job (queued, running, done, failed or cancelled), with its
+                        summary, and the table of every cycle when "timeline" was requested
+    DELETE /jobs/<id>   cancel a job; a job that is already running finishes in its worker,
+                        but its result is dropped
+
+Usage:
+    python ISRR_service.py --port 8765 --jobs 4
+    
+    from ISRR_service import ServiceClient
+    client = ServiceClient('http://127.0.0.1:8765')
+    result = client.wait(client.submit({'trace': 'input_1.txt', 'mode': 'ooo_retirement', 'units': 2}))
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ISRR_simulator import ENGINE_EVENT, ENGINES, MODES, ParsedTrace, parse_instruction, parse_unit_pools, simulate
+
+# States of a job
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+# Largest request body accepted (bytes)
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+# Parsed traces of the current worker process, least recently used first
+_worker_traces = OrderedDict()
+
+# Function to parse a trace sent as text, raises ValueError on the first invalid line
+def parse_trace_text(text):
+    instructions = []
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        instruction = parse_instruction(line)
+        if instruction is None:
+            raise ValueError(f"Invalid instruction on line {number}: {line!r}")
+        instructions.append(instruction)
+    return ParsedTrace(instructions)
+
+# Function to get the parsed trace of a job in a worker process, parsing it only if it is not in memory
+# Files are identified by their path, size and modification time, so a changed file is parsed again.
+def _load_trace(request, trace_cache_size):
+    if 'trace' in request:
+        status = os.stat(request['trace'])
+        key = ('file', os.path.abspath(request['trace']), status.st_size, status.st_mtime_ns)
+    else:
+        key = ('text', request['instructions'])
+    
+    trace = _worker_traces.get(key)
+    if trace is not None:
+        _worker_traces.move_to_end(key)
+        return trace
+    
+    trace = ParsedTrace.from_file(request['trace']) if 'trace' in request else parse_trace_text(request['instructions'])
+    _worker_traces[key] = trace
+    while len(_worker_traces) > trace_cache_size:
+        _worker_traces.popitem(last=False)
+    return trace
+
+# Function to run a job in a worker process, returns its result as a dictionary
+def _run_job(request, trace_cache_size):
+    trace = _load_trace(request, trace_cache_size)
+    num_units = request['units']
+    timeline = request.get('timeline', False)
+    unit_pools = request.get('unit_pools')
+    if unit_pools is not None:
+        unit_pools = parse_unit_pools(unit_pools)
+    
+    result = simulate(trace, request['mode'], num_units, request.get('rob_size'), request.get('engine', ENGINE_EVENT),
+                      request.get('physical_registers'), request.get('count_stalls', False), summary=not timeline,
+                      issue_window=request.get('issue_window'), unit_pools=unit_pools)
+    if not timeline:
+        return result._asdict()
+    
+    # Build the table of every cycle without pandas
+    totals = result.trace.summarize(num_units)
+    issued, retired = result.trace.to_strings(trace)
+    return {'mode': result.mode, 'num_units': num_units, 'num_instructions': result.num_instructions, 'cycles': result.cycles,
+            'ipc': result.ipc, 'utilization': totals.utilization, 'average_latency': totals.average_latency,
+            'stalls': result.stalls, 'phase_times': result.phase_times, 'unit_usage': result.unit_usage,
+            'timeline': [{'cycle': cycle, 'issued': issued[cycle - 1], 'retired': retired[cycle - 1]} for cycle in range(1, result.cycles + 1)]}
+
+# Function to check a job request before it is queued, raises ValueError if it is not valid
+def check_request(request):
+    if not isinstance(request, dict):
+        raise ValueError("The request must be a JSON object")
+    if ('trace' in request) == ('instructions' in request):
+        raise ValueError("The request needs either a trace file or instructions")
+    if 'trace' in request and not os.path.isfile(request['trace']):
+        raise ValueError(f"Trace file {request['trace']!r} not found")
+    if 'instructions' in request and not isinstance(request['instructions'], str):
+        raise ValueError("The instructions must be a string with one instruction per line")
+    if request.get('mode') not in MODES:
+        raise ValueError(f"Invalid mode {request.get('mode')!r}, expected one of {', '.join(MODES)}")
+    if request.get('engine', ENGINE_EVENT) not in ENGINES:
+        raise ValueError(f"Invalid engine {request.get('engine')!r}, expected one of {', '.join(ENGINES)}")
+    if not isinstance(request.get('units'), int) or request['units'] < 1:
+        raise ValueError("The number of functional units must be an integer of at least 1")
+    for name in ('rob_size', 'physical_registers', 'issue_window'):
+        if request.get(name) is not None and (not isinstance(request[name], int) or request[name] < 1):
+            raise ValueError(f"{name} must be a positive integer")
+    if request.get('unit_pools') is not None:
+        try:
+            parse_unit_pools(request['unit_pools'])
+        except (argparse.ArgumentTypeError, AttributeError):
+            raise ValueError(f"Invalid functional unit pools {request['unit_pools']!r}")
+
+# Job of the service: request, future of its run in the pool and result
+class Job:
+    
+    def __init__(self, job_id, request, future):
+        self.id = job_id
+        self.request = request
+        self.future = future
+        self.state = JOB_QUEUED
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+    
+    # Description of the job, with its result once it is done
+    def to_dict(self, result=True):
+        state = self.state
+        if state == JOB_QUEUED and self.future.running():
+            state = JOB_RUNNING
+        
+        description = {'id': self.id, 'state': state, 'submitted': self.submitted, 'finished': self.finished}
+        if self.error is not None:
+            description['error'] = self.error
+        if result and self.result is not None:
+            description['result'] = self.result
+        return description
+
+# Simulation service: job table and pool of worker processes
+# At most max_jobs finished jobs are kept, the oldest ones are forgotten first.
+class SimulationService:
+    
+    def __init__(self, jobs=None, trace_cache_size=16, max_jobs=1000):
+        self.executor = ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1)
+        self.trace_cache_size = trace_cache_size
+        self.max_jobs = max_jobs
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+    
+    # Queue a job, returns it
+    def submit(self, request):
+        check_request(request)
+        
+        with self.lock:
+            job = Job(uuid.uuid4().hex, request, self.executor.submit(_run_job, request, self.trace_cache_size))
+            self.jobs[job.id] = job
+            self.forget_finished_jobs()
+        
+        job.future.add_done_callback(lambda future: self.finish(job, future))
+        return job
+    
+    # Save the result of a job when its run ends
+    def finish(self, job, future):
+        with self.lock:
+            job.finished = time.time()
+            if job.state == JOB_CANCELLED:
+                return
+            
+            try:
+                job.result = future.result()
+                job.state = JOB_DONE
+            except CancelledError:
+                job.state = JOB_CANCELLED
+            except Exception as error:
+                job.error = f"{type(error).__name__}: {error}"
+                job.state = JOB_FAILED
+    
+    # Get a job, or None if there is no such job
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+    
+    # Get all the jobs, oldest first
+    def list(self):
+        with self.lock:
+            return list(self.jobs.values())
+    
+    # Cancel a job, returns False if it has already finished
+    def cancel(self, job_id):
+        with self.lock:
+            job = self.jobs[job_id]
+            if job.state != JOB_QUEUED:
+                return job.state == JOB_CANCELLED
+            job.state = JOB_CANCELLED
+        
+        # Cancelling a pending future runs finish right away, which takes the lock
+        # A running job can't be stopped, its result is dropped when it ends
+        job.future.cancel()
+        return True
+    
+    # Forget the oldest finished jobs above max_jobs (called with the lock held)
+    def forget_finished_jobs(self):
+        excess = len(self.jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.state != JOB_QUEUED][:max(excess, 0)]:
+            del self.jobs[job_id]
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+# Handler of the HTTP requests, the service is an attribute of the server
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    
+    # Send a JSON response
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    # Get the job id of a /jobs/<id> path, or None
+    def job_id(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'jobs':
+            return parts[1]
+        return None
+    
+    def do_POST(self):
+        if self.path.rstrip('/') != '/jobs':
+            self.send_json(404, {'error': "Not found"})
+            return
+        
+        length = int(self.headers.get('Content-Length', 0))
+        if length > MAX_REQUEST_BYTES:
+            self.send_json(413, {'error': "Request too large"})
+            return
+        
+        try:
+            request = json.loads(self.rfile.read(length) or b'null')
+            job = self.server.service.submit(request)
+        except ValueError as error:
+            self.send_json(400, {'error': str(error)})
+            return
+        
+        self.send_json(202, job.to_dict())
+    
+    def do_GET(self):
+        if self.path.rstrip('/') == '/jobs':
+            self.send_json(200, {'jobs': [job.to_dict(result=False) for job in self.server.service.list()]})
+            return
+        
+        job = self.server.service.get(self.job_id())
+        if job is None:
+            self.send_json(404, {'error': "Job not found"})
+            return
+        self.send_json(200, job.to_dict())
+    
+    def do_DELETE(self):
+        job_id = self.job_id()
+        if self.server.service.get(job_id) is None:
+            self.send_json(404, {'error': "Job not found"})
+            return
+        
+        if not self.server.service.cancel(job_id):
+            self.send_json(409, {'error': "The job has already finished"})
+            return
+        self.send_json(200, self.server.service.get(job_id).to_dict())
+    
+    # Only log the requests when the server is verbose
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+# Function to create the HTTP server of a service, listening on localhost only
+def create_server(service, port=8765, verbose=False):
+    server = ThreadingHTTPServer(('127.0.0.1', port), ServiceRequestHandler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+# Client of the service, for the tools that use it
+class ServiceClient:
+    
+    def __init__(self, url='http://127.0.0.1:8765'):
+        self.url = url.rstrip('/')
+    
+    # Send a request, returns the decoded JSON response, raises ValueError with the error of the service
+    def request(self, method, path, body=None):
+        data = None if body is None else json.dumps(body).encode()
+        request = urllib.request.Request(self.url + path, data=data, method=method, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            raise ValueError(json.loads(error.read()).get('error', str(error))) from None
+    
+    # Submit a job, returns its id
+    def submit(self, job):
+        return self.request('POST', '/jobs', job)['id']
+    
+    def status(self, job_id):
+        return self.request('GET', f'/jobs/{job_id}')
+    
+    def cancel(self, job_id):
+        return self.request('DELETE', f'/jobs/{job_id}')
+    
+    # Wait until a job ends, returns its result, raises ValueError if it failed or was cancelled
+    def wait(self, job_id, interval=0.05, timeout=None):
+        start = time.monotonic()
+        while True:
+            status = self.status(job_id)
+            if status['state'] == JOB_DONE:
+                return status['result']
+            if status['state'] in (JOB_FAILED, JOB_CANCELLED):
+                raise ValueError(f"Job {job_id} {status['state']}" + (f": {status['error']}" if 'error' in status else ''))
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise TimeoutError(f"Job {job_id} did not finish in {timeout} s")
+            time.sleep(interval)
+
+# Function to parse the command line arguments
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description="Run the Multi-Issue Processor Simulator as a local service.")
+    parser.add_argument('--port', type=int, default=8765, help="port to listen on, on localhost (default: 8765)")
+    parser.add_argument('--jobs', type=int, default=0, help="number of worker processes, 0 for one per core (default: 0)")
+    parser.add_argument('--trace-cache', type=int, default=16, help="parsed traces kept in memory by each worker (default: 16)")
+    parser.add_argument('--max-jobs', type=int, default=1000, help="finished jobs kept for status requests (default: 1000)")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("the number of jobs can't be negative")
+    if args.trace_cache < 1:
+        parser.error("the trace cache must hold at least 1 trace")
+    if args.max_jobs < 1:
+        parser.error("at least 1 finished job must be kept")
+    
+    return args
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    
+    service = SimulationService(args.jobs or None, args.trace_cache, args.max_jobs)
+    server = create_server(service, args.port, args.verbose)
+    print(f"Listening on http://127.0.0.1:{server.server_address[1]}")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+if __name__ == '__main__':
+    main()
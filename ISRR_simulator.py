@@ -1,710 +1,3095 @@
-# Final Project
-# By Santiago Jimenez
-# Date: 12/11/2023
-
-"""
-Program to simulate the scheduling of instructions into a multi-issue processor. 
-
-The program takes input in the form of instructions, where each instruction is a 
-string of the form:
-
-    <destination register>,<source register 1>,<source register 2>,<operation>.
-    
-    
-The program then schedules these instructions into a multi-issue processor.
-
-The program will output the scheduling of the instructions.
-
-The scheduler should check for RAW, WAR and WAW dependencies, and delay instructions
-as appropriate.
-
-Instruction latencies:
-    o	+, -:  1 cycle
-    o	*: 2 cycles
-    o	Load, Store: 3 cycles
-    
-Processor capabilities:
-    a.	Single instruction, in-order execution
-    b.	Superscalar, in-order execution
-    c.	Superscalar, out-of-order issue, in-order retirement
-    d.	Superscalar, out-of-order issue and retirement
-
-Input format:
-    r3,r0,r1,*
-    r4,r0,r2,+
-    r5,r0,r1,+
-    ...
-    
-Output format: Is a table with the following columns:
-    o	Cycle: The cycle number
-    o	Instructions Issued: The instructions issued in that cycle
-    o	Retired: The instructions retired in that cycle
-    
-"""
-import pandas as pd
-
-# Registers array (register number, read count, write count)
-registers = [[0,0,0],[1,0,0],[2,0,0],[3,0,0],[4,0,0],[5,0,0],[6,0,0],[7,0,0],[8,0,0],[9,0,0],[10,0,0],[11,0,0],[12,0,0],[13,0,0]]
-
-# Function to update the registers
-def update_registers(instruction, operation):
-    
-    #Get the destination register
-    destination_register = int(instruction[0][1:])
-    
-    # Get the source registers
-    source_register_1 = int(instruction[1][1:])
-    source_register_2 = int(instruction[2][1:])
-    
-    # Update the registers
-    if operation == 0:#allocating
-        registers[source_register_1][1] += 1
-        registers[source_register_2][1] += 1
-        registers[destination_register][2] += 1
-    elif operation == 1:#freeing
-        registers[source_register_1][1] -= 1
-        registers[source_register_2][1] -= 1
-        registers[destination_register][2] -= 1
-    else:
-        print("Invalid operation")
-    
-# Function to get the number of registers in use
-def register_in_use():
-    in_use = 0
-    
-    for i in range(len(registers)):
-        
-        # If the register is in use, add 1 to the counter
-        if registers[i][1] > 0 or registers[i][2] > 0:
-            in_use += 1
-            
-    return in_use
-
-# Function to read the input file and return an array of lists of instructions
-def read_instructions_from_file(filename):
-    
-    # Initialize the instructions array
-    instructions = []
-    
-    
-    try:
-        with open(filename, 'r') as file:
-            for line in file:
-                
-                # Split each line by comma and remove leading/trailing whitespace
-                parts = line.strip().split(',')
-                
-                # Check if the instruction is valid
-                if len(parts) == 4:
-                    
-                    # Add the instruction to the instructions array
-                    instructions.append(parts)
-                    
-                    # add number of cycles to complete instruction
-                    if parts[3] == '*':
-                        instructions[-1].append(2)
-                    elif parts[3] == '+' or parts[3] == '-':
-                        instructions[-1].append(1)
-                    elif parts[3] == 'Load' or parts[3] == 'Store':
-                        instructions[-1].append(3)
-                    else:
-                        print(f"Ignoring invalid instruction: {line}")
-                        
-                else:
-                    print(f"Ignoring invalid instruction: {line}")
-                
-                # Add the retired flag to the instruction
-                instructions[-1].append(0)
-                
-    # Handle file not found error
-    except FileNotFoundError:
-        print(f"File '{filename}' not found.")
-        
-    # Return the instructions array
-    return instructions
-
-# Function to print the instructions in a readable format using pandas
-def print_instructions(instructions):
-    df = pd.DataFrame(instructions, columns=['Destination', 'Source 1', 'Source 2', 'Operation', 'Cycles', 'Retired'])
-    print(df)
-    
-# Function to check if the next instruction has a dependency with registers in use
-def check_dependency(instruction):
-    
-    #Get the destination register
-    destination_register = int(instruction[0][1:])
-    
-    # Get the source registers
-    source_register_1 = int(instruction[1][1:])
-    source_register_2 = int(instruction[2][1:])
-    
-    # Check if there is a dependency
-    if registers[source_register_1][2] > 0 or registers[source_register_2][2] > 0 or registers[destination_register][2] > 0 or registers[destination_register][1] > 0:
-        return True
-    else:
-        return False
-    
-# Check if there is a dependency between two instructions
-def check_dependency2(instruction1, instruction2):
-    
-    #Get the destination register
-    destination_register1 = int(instruction1[0][1:])
-    
-    # Get the source registers
-    source_register1_1 = int(instruction1[1][1:])
-    source_register1_2 = int(instruction1[2][1:])
-    
-    #Get the destination register
-    destination_register2 = int(instruction2[0][1:])
-
-    # Get the source registers
-    source_register2_1 = int(instruction2[1][1:])
-    source_register2_2 = int(instruction2[2][1:])
-
-    # Check if there is a dependency
-    if destination_register1 == source_register2_1 or destination_register1 == source_register2_2 or destination_register1 == destination_register2 or destination_register2 == source_register1_1 or destination_register2 == source_register1_2:
-        return True
-    else:
-        return False
-   
-# Function for scheduling instructions with single instruction/superscalar, in-order execution
-def in_order_execution(instructions, num_units):
-    
-    # Initialize variables
-    cycle = 0
-    num_instructions = len(instructions)
-    reg_in_use = 0
-    done = False
-    
-    # Save scheduled instructions in a pandas dataframe
-    df = pd.DataFrame(columns=['Cycle', 'Instructions Issued','Retired'])
-    df['Cycle'] = df['Cycle'].astype(int)
-    df['Instructions Issued'] = df['Instructions Issued'].astype(str)
-    df['Retired'] = df['Retired'].astype(str)
-    
-    # Initialize the instructions issued and retired columns
-    df.at[0, 'Instructions Issued'] = ''
-    df.at[0, 'Retired'] = ''
-    
-    # Initialize the instructions issued and retired lists
-    instructions_issued = [[0,0,0,0,0,1]]
-    instructions_retired = []
-    
-    # Initialize the instructions issued and retired strings
-    instructions_issued_str = ''
-    instructions_retired_str = ''
-    
-    # Start scheduling
-    while not done:
-        
-        # Reset the instructions issued and retired strings
-        instructions_retired_str = ''
-        instructions_issued_str = ''
-        
-        # Issue up to num_units instructions per cycle
-        for i in range(num_units):
-            
-            # check if there is a dependency with the next instruction
-            bool_dependency = False
-            
-            if len(instructions_issued) > 0:
-                try:
-                    bool_dependency = check_dependency(instructions[len(instructions_issued)-1])
-                except IndexError:
-                    bool_dependency = True
-                
-            # if there is no dependency, issue the instruction
-            if not bool_dependency:
-                
-                # Add the instruction to the instructions issued list
-                instructions_issued.append(instructions[len(instructions_issued)-1])
-                
-                # Update the instructions issued string
-                last_instruction = len(instructions_issued) - 1
-                
-                # Handle load and store instructions for visual purposes
-                if instructions_issued[last_instruction][3] == 'Load':
-                    
-                    instructions_issued_str += f"{last_instruction}. {instructions_issued[last_instruction][2]} = {instructions_issued[last_instruction][3]} "
-                
-                elif instructions_issued[last_instruction][3] == 'Store':
-                    
-                    instructions_issued_str += f"{last_instruction}. {instructions_issued[last_instruction][3]} = {instructions_issued[last_instruction][0]} "
-                
-                else:
-                    
-                    instructions_issued_str += f"{last_instruction}. {instructions_issued[last_instruction][0]} = {instructions_issued[last_instruction][1]} {instructions_issued[last_instruction][3]} {instructions_issued[last_instruction][2]} "
-                
-                # Update registers
-                update_registers(instructions_issued[last_instruction],0)
-                
-        # Check if a instruction can be retired
-        for j in range(len(instructions_issued)):
-            
-            if (instructions_issued[j][4] < 1 and instructions_issued[j][5] == 0 and instructions_issued[j-1][5] == 1 and instructions_issued[j][0] != 0):
-                
-                # Update variables, arrays and strings
-                last_instruction = len(instructions_issued) - 1
-                instructions_retired_str += f"{j}. "
-                instructions_issued[j][5] = 1
-                instructions_retired.append(instructions_issued[j])
-                
-                # Update registers
-                update_registers(instructions_issued[j],1)
-                  
-        # Update the number of cycles to complete the instruction
-        for i in range(len(instructions_issued)):
-            
-            # If the instruction is not completed, subtract 1 from the number of cycles to complete it
-            if instructions_issued[i][4] > 0:
-                instructions_issued[i][4] -= 1
-            
-        # Update the cycle counter
-        cycle += 1
-        
-        # Update the dataframe
-        df.at[cycle, 'Cycle'] = cycle
-        df.at[cycle, 'Instructions Issued'] = instructions_issued_str
-        df.at[cycle, 'Retired'] = instructions_retired_str
-        
-        # Check if there are instructions running
-        reg_in_use = register_in_use()
-            
-        # If there are no instructions running, and all instructions have been retired, then we are done
-        if reg_in_use == 0 and len(instructions_retired) == num_instructions:
-            done = True
-        
-    # Return the dataframe    
-    return df
- 
-# Function for scheduling instructions with superscalar, out-of-order issue, in-order retirement
-def out_of_order_issue_in_order_retirement(instructions, num_units):
-    
-    # Initialize variables
-    cycle = 0
-    num_instructions = len(instructions)
-    reg_in_use = 0
-    done = False
-    
-    # Save scheduled instructions in a pandas dataframe
-    df = pd.DataFrame(columns=['Cycle', 'Instructions Issued','Retired'])
-    df['Cycle'] = df['Cycle'].astype(int)
-    df['Instructions Issued'] = df['Instructions Issued'].astype(str)
-    df['Retired'] = df['Retired'].astype(str)
-    
-    # Initialize the instructions issued and retired columns
-    df.at[0, 'Instructions Issued'] = ''
-    df.at[0, 'Retired'] = ''
-    
-    # Initialize the instructions issued and retired lists
-    instructions_issued = [[0,0,0,0,0,1,0]]
-    instructions_retired = []
-    
-    # Initialize the instructions issued and retired strings
-    instructions_issued_str = ''
-    instructions_retired_str = ''
-    
-    # Start scheduling
-    while not done:
-        
-        # Reset the instructions issued and retired strings
-        instructions_retired_str = ''
-        instructions_issued_str = ''
-        
-        # Issue up to num_units instructions per cycle
-        for i in range(num_units):
-
-            # Allow instructions to be issued out of order
-            for k in range(num_instructions):
-                
-                # check if there is are dependencies
-                bool_dependency1 = False
-                bool_dependency2 = False
-                
-                # check if there is a dependency with the next instruction (check that the required registers are not in use)
-                if len(instructions_issued) > 1 and instructions[k][4] > 0:
-                    try:
-                        bool_dependency1 = check_dependency(instructions[k])
-                    except IndexError:
-                        bool_dependency1 = True
-
-                # Make sure to not violate RAW dependencies so that the program is correct
-                if len(instructions_issued) > 1 and instructions[k][4] > 0:
-                    try:
-                        
-                        #  Check current instruction with all past instructions (issued or not issued) to see if there is a dependency
-                        for l in range(k-1, -1, -1):
-                            if instructions[l][5] == 1:
-                                bool_dependency2 = False
-                                break
-                            else:
-                                bool_dependency2 = check_dependency2(instructions[l], instructions[k])
-                            if bool_dependency2:
-                                break
-
-                    except IndexError:
-                        bool_dependency2 = True
-                    
-                # if there is no dependency, issue the instruction
-                if not bool_dependency1 and not bool_dependency2 and instructions[k][4] > 0:
-                    
-                    # Add the instruction to the instructions issued list
-                    instructions_issued.append(instructions[k])
-
-                    # Add the number of the instruction at the end of the list
-                    instructions_issued[-1].append(k+1)
-                    
-                    # Update the instructions issued string
-                    last_instruction = len(instructions_issued) - 1
-
-                    # Handle load and store instructions for visual purposes
-                    if instructions_issued[last_instruction][3] == 'Load':
-                        
-                        instructions_issued_str += f"{k+1}. {instructions_issued[last_instruction][2]} = {instructions_issued[last_instruction][3]} "
-                    
-                    elif instructions_issued[last_instruction][3] == 'Store':
-                        
-                        instructions_issued_str += f"{k+1}. {instructions_issued[last_instruction][3]} = {instructions_issued[last_instruction][0]} "
-                    
-                    else:
-                        
-                        instructions_issued_str += f"{k+1}. {instructions_issued[last_instruction][0]} = {instructions_issued[last_instruction][1]} {instructions_issued[last_instruction][3]} {instructions_issued[last_instruction][2]} "
-                        
-                    # Update registers
-                    update_registers(instructions_issued[last_instruction],0)
-                    
-                    break
-
-        # Temporal list with instructions issued in order        
-        instructions_issued_temp = instructions_issued.copy()
-        instructions_issued_temp.sort(key=lambda x: x[6])
-
-        # Check if a instruction can be retired, only allow in order retirement
-        # Use the temporal list to check for in order retirement
-        for j in range(len(instructions_issued_temp)):
-            
-            # Check if the instruction can be retired
-            if (instructions_issued_temp[j][4] < 1 and instructions_issued_temp[j][5] == 0 and instructions_issued_temp[j][0] != 0 and instructions_issued_temp[j-1][6] == instructions_issued_temp[j][6] - 1 and instructions_issued_temp[j-1][5] == 1):
-                
-                # Update variables, arrays and strings
-                last_instruction = len(instructions_issued) - 1
-                instructions_retired_str += f"{instructions_issued_temp[j][6]}. "
-                instructions_issued_temp[j][5] = 1
-                instructions_retired.append(instructions_issued_temp[j])
-                
-                # Update registers
-                update_registers(instructions_issued_temp[j],1)
-        
-        # Update the number of cycles to complete the instruction
-        for i in range(len(instructions_issued)):
-            if instructions_issued[i][4] > 0:
-                instructions_issued[i][4] -= 1
-            
-        # Update the cycle counter
-        cycle += 1
-        
-        # Update the dataframe
-        df.at[cycle, 'Cycle'] = cycle
-        df.at[cycle, 'Instructions Issued'] = instructions_issued_str
-        df.at[cycle, 'Retired'] = instructions_retired_str
-        
-        # Check if there are instructions running
-        reg_in_use = register_in_use()
-        
-        # If there are no instructions running, and all instructions have been retired, then we are done
-        if reg_in_use == 0 and len(instructions_retired) == num_instructions:
-            done = True
-        
-    # Return the dataframe    
-    return df
-
-# Function for scheduling instructions with superscalar, out-of-order issue and retirement
-def out_of_order_issue_and_retirement(instructions, num_units):
-    
-    # Initialize variables
-    cycle = 0
-    num_instructions = len(instructions)
-    reg_in_use = 0
-    done = False
-    
-    # Save scheduled instructions in a pandas dataframe
-    df = pd.DataFrame(columns=['Cycle', 'Instructions Issued','Retired'])
-    df['Cycle'] = df['Cycle'].astype(int)
-    df['Instructions Issued'] = df['Instructions Issued'].astype(str)
-    df['Retired'] = df['Retired'].astype(str)
-    
-    # Initialize the instructions issued and retired columns
-    df.at[0, 'Instructions Issued'] = ''
-    df.at[0, 'Retired'] = ''
-    
-    # Initialize the instructions issued and retired lists
-    instructions_issued = [[0,0,0,0,0,1,0]]
-    instructions_retired = []
-    
-    # Initialize the instructions issued and retired strings
-    instructions_issued_str = ''
-    instructions_retired_str = ''
-    
-    # Start scheduling
-    while not done:
-        
-        # Reset the instructions issued and retired strings
-        instructions_retired_str = ''
-        instructions_issued_str = ''
-        
-        # Issue up to num_units instructions per cycle
-        for i in range(num_units):
-
-            # Allow instructions to be issued out of order
-            for k in range(num_instructions):
-                
-                # check if there is are dependencies
-                bool_dependency1 = False
-                bool_dependency2 = False
-                
-                # check if there is a dependency with the next instruction (check that the required registers are not in use)
-                if len(instructions_issued) > 1 and instructions[k][4] > 0:
-                    try:
-                        bool_dependency1 = check_dependency(instructions[k])
-                    except IndexError:
-                        bool_dependency1 = True
-
-                # Make sure to not violate RAW dependencies so that the program is correct
-                if len(instructions_issued) > 1 and instructions[k][4] > 0:
-                    try:
-                        
-                        # Check current instruction with all past instructions (issued or not issued) to see if there is a dependency
-                        for l in range(k-1, -1, -1):
-                            if instructions[l][5] == 1:
-                                bool_dependency2 = False
-                                break
-                            else:
-                                bool_dependency2 = check_dependency2(instructions[l], instructions[k])
-                            if bool_dependency2:
-                                break
-
-                    except IndexError:
-                        bool_dependency2 = True
-                    
-                # if there is no dependency, issue the instruction
-                if not bool_dependency1 and not bool_dependency2 and instructions[k][4] > 0:
-                    
-                    # Add the instruction to the instructions issued list
-                    instructions_issued.append(instructions[k])
-
-                    # Add the number of the instruction at the end of the list
-                    instructions_issued[-1].append(k+1)
-                    
-                    # Update the instructions issued string
-                    last_instruction = len(instructions_issued) - 1
-                    
-                    # Handle load and store instructions for visual purposes
-                    if instructions_issued[last_instruction][3] == 'Load':
-                        
-                        instructions_issued_str += f"{k+1}. {instructions_issued[last_instruction][2]} = {instructions_issued[last_instruction][3]} "
-                    
-                    elif instructions_issued[last_instruction][3] == 'Store':
-                        
-                        instructions_issued_str += f"{k+1}. {instructions_issued[last_instruction][3]} = {instructions_issued[last_instruction][0]} "
-                    
-                    else:
-                        
-                        instructions_issued_str += f"{k+1}. {instructions_issued[last_instruction][0]} = {instructions_issued[last_instruction][1]} {instructions_issued[last_instruction][3]} {instructions_issued[last_instruction][2]} "
-                             
-                    # Update registers
-                    update_registers(instructions_issued[last_instruction],0)
-                    
-                    break
-                
-        # Check if a instruction can be retired
-        for j in range(len(instructions_issued)):
-            
-            if (instructions_issued[j][4] < 1 and instructions_issued[j][5] == 0 and instructions_issued[j][0] != 0):
-                
-                # Update variables, arrays and strings
-                last_instruction = len(instructions_issued) - 1
-                instructions_retired_str += f"{instructions_issued[j][6]}. "
-                instructions_issued[j][5] = 1
-                instructions_retired.append(instructions_issued[j])
-                
-                # Update registers
-                update_registers(instructions_issued[j],1)
-            
-
-            
-        # Update the number of cycles to complete the instruction
-        for i in range(len(instructions_issued)):
-            if instructions_issued[i][4] > 0:
-                instructions_issued[i][4] -= 1
-            
-        # Update the cycle counter
-        cycle += 1
-        
-        # Update the dataframe
-        df.at[cycle, 'Cycle'] = cycle
-        df.at[cycle, 'Instructions Issued'] = instructions_issued_str
-        df.at[cycle, 'Retired'] = instructions_retired_str
-        
-        # Check if there are instructions running
-        reg_in_use = register_in_use()
-            
-        # If there are no instructions running, and all instructions have been retired, then we are done
-        if reg_in_use == 0 and len(instructions_retired) == num_instructions:
-            done = True
-        
-    # Return the dataframe    
-    return df            
-
-#############################################################################################################################       
-        
-# Start of program
-print("Multi-Issue Processor Simulator\n")
-
-print("Select input file: \n")
-print("1. input_1")
-print("2. input_2")
-print("3. input_1 (with_register renaming)")
-print("4. input_2 (with_register renaming)")
-print("\n")
-
-# Ask for input file
-input_file = 0
-
-while input_file <= 0 or input_file > 4:
-    try:
-        input_file = int(input("Enter input file: "))
-    except ValueError:
-        print("Invalid input. Please enter a positive integer.")
-
-# Initialize the instructions array
-instructions = []
-
-# Switch to select input file
-match input_file:
-    
-    # Read the instructions from the input file 1
-    case 1:
-        print("input_1")
-        instructions = read_instructions_from_file('input_1.txt')
-    
-    # Read the instructions from the input file 2
-    case 2:
-        print("input_2")
-        instructions = read_instructions_from_file('input_2.txt')
-    
-    # Read the instructions from the input file 3
-    case 3:
-        print("input_1 (with_register renaming)")
-        instructions = read_instructions_from_file('input_3.txt')
-    
-    # Read the instructions from the input file 4    
-    case 4:
-        print("input_2 (with_register renaming)")
-        instructions = read_instructions_from_file('input_4.txt')
-        
-    case _:
-        print("Invalid input. Please enter a positive integer.")
-        
-# Print the instructions
-if len(instructions) > 0:
-    print_instructions(instructions)
-        
-# Ask for processor setting
-print("\nSelect processor setting: \n")
-print("1. Single instruction, in-order execution")
-print("2. Superscalar, in-order execution")
-print("3. Superscalar, out-of-order issue, in-order retirement")
-print("4. Superscalar, out-of-order issue and retirement")
-print("\n")
-
-processor_setting = 0
-
-while processor_setting <= 0 or processor_setting > 4:
-    try:
-        processor_setting = int(input("Enter processor setting: \n"))
-    except ValueError:
-        print("Invalid input. Please enter a positive integer.")
-
-# Switch to select processor setting
-match processor_setting:
-    
-    # Call function for single instruction, in-order execution
-    case 1:
-        
-        print("Single instruction, in-order execution\n")
-        
-        # Call function
-        df=in_order_execution(instructions, 1)
-        
-        # Print results
-        print(df)
-    
-    # Call function for superscalar, in-order execution        
-    case 2:
-        
-        print("Superscalar, in-order execution\n")
-        
-        # Ask for number of parallel functional units
-        num_units = 0
-        
-        while num_units <= 0:
-            try:
-                num_units = int(input("Enter the number of parallel functional units: "))
-            except ValueError:
-                print("Invalid input. Please enter a positive integer.")
-
-        print("\n")
-        
-        # Call function
-        df=in_order_execution(instructions, num_units)
-        
-        # Print results
-        print(df)
-        
-    # Call function for superscalar, out-of-order issue, in-order retirement
-    case 3:
-        
-        print("Superscalar, out-of-order issue, in-order retirement")
-        
-        # Ask for number of parallel functional units
-        num_units = 0
-        
-        while num_units <= 0:
-            try:
-                num_units = int(input("Enter the number of parallel functional units: "))
-            except ValueError:
-                print("Invalid input. Please enter a positive integer.")
-
-        print("\n")
-        
-        # Call function
-        df = out_of_order_issue_in_order_retirement(instructions, num_units)
-        
-        # Print results
-        print(df)
-        
-    # Call function for superscalar, out-of-order issue and retirement
-    case 4:
-        
-        print("Superscalar, out-of-order issue and retirement")
-        
-        # Ask for number of parallel functional units
-        num_units = 0
-        
-        while num_units <= 0:
-            try:
-                num_units = int(input("Enter the number of parallel functional units: "))
-            except ValueError:
-                print("Invalid input. Please enter a positive integer.")
-
-        print("\n")
-        
-        # Call function
-        df = out_of_order_issue_and_retirement(instructions, num_units)
-        
-        # Print results
-        print(df)
-        
-    case _:
-        
-        print("Invalid input. Please enter a positive integer.")
\ No newline at end of file
+# Final Project
+# By Santiago Jimenez
+# Date: 12/11/2023
+
+"""
+Program to simulate the scheduling of instructions into a multi-issue processor. 
+
+The program takes input in the form of instructions, where each instruction is a 
+string of the form:
+
+    <destination register>,<source register 1>,<source register 2>,<operation>.
+    
+    
+The program then schedules these instructions into a multi-issue processor.
+
+The program will output the scheduling of the instructions.
+
+The scheduler should check for RAW, WAR and WAW dependencies, and delay instructions
+as appropriate.
+
+Instruction latencies:
+    o	+, -:  1 cycle
+    o	*: 2 cycles
+    o	Load, Store: 3 cycles
+    
+Processor capabilities:
+    a.	Single instruction, in-order execution
+    b.	Superscalar, in-order execution
+    c.	Superscalar, out-of-order issue, in-order retirement
+    d.	Superscalar, out-of-order issue and retirement
+
+Input format:
+    r3,r0,r1,*
+    r4,r0,r2,+
+    r5,r0,r1,+
+    ...
+    
+Output format: Is a table with the following columns:
+    o	Cycle: The cycle number
+    o	Instructions Issued: The instructions issued in that cycle
+    o	Retired: The instructions retired in that cycle
+    
+Usage:
+    python ISRR_simulator.py                      interactive menus
+    python ISRR_simulator.py input_1.txt input_2.txt --modes ooo_retirement --units 1 2 4
+                                                  batch mode, one summary line per configuration
+    
+    from ISRR_simulator import simulate
+    result = simulate('input_1.txt', 'ooo_retirement', 2)
+    
+"""
+import argparse
+import csv
+import hashlib
+import heapq
+import json
+import os
+import pickle
+import statistics
+import sys
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from array import array
+from enum import IntEnum
+from itertools import islice
+
+# pandas is only imported when a table is built, so the module imports fast
+
+# Processor modes
+MODE_IN_ORDER = 'in_order'
+MODE_OOO_IN_ORDER_RETIREMENT = 'ooo_in_order_retirement'
+MODE_OOO_RETIREMENT = 'ooo_retirement'
+MODES = (MODE_IN_ORDER, MODE_OOO_IN_ORDER_RETIREMENT, MODE_OOO_RETIREMENT)
+
+# Scheduling engines
+ENGINE_CYCLE = 'cycle'
+ENGINE_EVENT = 'event'
+ENGINE_BATCH = 'batch'
+ENGINES = (ENGINE_CYCLE, ENGINE_EVENT, ENGINE_BATCH)
+
+# Version of the schedulers, change it whenever the schedules they produce change (invalidates cached results)
+ENGINE_VERSION = 1
+
+# Operations supported by the processor
+class Opcode(IntEnum):
+    ADD = 0
+    SUB = 1
+    MUL = 2
+    LOAD = 3
+    STORE = 4
+
+# Symbol of each operation in the input files
+OPCODE_SYMBOLS = {Opcode.ADD: '+', Opcode.SUB: '-', Opcode.MUL: '*', Opcode.LOAD: 'Load', Opcode.STORE: 'Store'}
+SYMBOL_OPCODES = {symbol: opcode for opcode, symbol in OPCODE_SYMBOLS.items()}
+
+# Number of cycles to complete each operation
+LATENCIES = {Opcode.ADD: 1, Opcode.SUB: 1, Opcode.MUL: 2, Opcode.LOAD: 3, Opcode.STORE: 3}
+
+# Classes of functional units and the class that executes each operation
+UNIT_ALU = 'alu'
+UNIT_MUL = 'mul'
+UNIT_MEM = 'mem'
+UNIT_CLASSES = (UNIT_ALU, UNIT_MUL, UNIT_MEM)
+OPCODE_UNITS = {Opcode.ADD: UNIT_ALU, Opcode.SUB: UNIT_ALU, Opcode.MUL: UNIT_MUL, Opcode.LOAD: UNIT_MEM, Opcode.STORE: UNIT_MEM}
+
+# Pool of functional units of one class: number of units, latency of its operations (None keeps the latency of
+# each instruction) and whether a unit accepts a new operation every cycle or only once the previous one completes
+FunctionalUnitPool = namedtuple('FunctionalUnitPool', ['count', 'latency', 'pipelined'], defaults=(None, True))
+
+# Function to check the unit pools of a scheduler, a dictionary from unit classes to FunctionalUnitPool
+def check_unit_pools(unit_pools):
+    for unit_class, pool in unit_pools.items():
+        if unit_class not in UNIT_CLASSES:
+            raise ValueError(f"Invalid unit class {unit_class!r}, expected one of {', '.join(UNIT_CLASSES)}")
+        if pool.count < 1:
+            raise ValueError(f"The {unit_class} pool must have at least 1 unit")
+        if pool.latency is not None and pool.latency < 1:
+            raise ValueError(f"The latency of the {unit_class} pool must be at least 1 cycle")
+
+# Instruction: register numbers, operation and latency
+# Instructions are immutable, the state of a run is kept by the schedulers (see RunContext)
+class Instruction:
+    __slots__ = ('destination', 'source_1', 'source_2', 'opcode', 'latency')
+    
+    def __init__(self, destination, source_1, source_2, opcode, latency=None):
+        object.__setattr__(self, 'destination', destination)
+        object.__setattr__(self, 'source_1', source_1)
+        object.__setattr__(self, 'source_2', source_2)
+        object.__setattr__(self, 'opcode', opcode)
+        object.__setattr__(self, 'latency', LATENCIES[opcode] if latency is None else latency)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Instructions are immutable")
+    
+    def __reduce__(self):
+        return (Instruction, (self.destination, self.source_1, self.source_2, self.opcode, self.latency))
+    
+    def __eq__(self, other):
+        if not isinstance(other, Instruction):
+            return NotImplemented
+        return (self.destination, self.source_1, self.source_2, self.opcode, self.latency) == (other.destination, other.source_1, other.source_2, other.opcode, other.latency)
+    
+    def __hash__(self):
+        return hash((self.destination, self.source_1, self.source_2, self.opcode, self.latency))
+    
+    def __repr__(self):
+        return f"Instruction(r{self.destination}, r{self.source_1}, r{self.source_2}, {OPCODE_SYMBOLS[self.opcode]})"
+
+# Layout of an instruction in a NumPy structured array, for bulk use
+INSTRUCTION_DTYPE = [('destination', 'u2'), ('source_1', 'u2'), ('source_2', 'u2'), ('opcode', 'u1'), ('latency', 'u1')]
+
+# Function to convert a list of instructions to a NumPy structured array
+def instructions_to_array(instructions):
+    import numpy as np
+    
+    return np.array([(instruction.destination, instruction.source_1, instruction.source_2, instruction.opcode, instruction.latency)
+                     for instruction in instructions], dtype=INSTRUCTION_DTYPE)
+
+# Function to convert a NumPy structured array back to a list of instructions
+def instructions_from_array(array):
+    return [Instruction(int(record['destination']), int(record['source_1']), int(record['source_2']), Opcode(int(record['opcode'])), int(record['latency']))
+            for record in array]
+
+# Function to parse a line of the input file, returns None if the instruction is not valid
+def parse_instruction(line):
+    
+    # Split the line by comma and remove leading/trailing whitespace
+    parts = line.strip().split(',')
+    
+    # Check the number of fields and the operation
+    if len(parts) != 4 or parts[3] not in SYMBOL_OPCODES:
+        return None
+    
+    # Get the register numbers
+    try:
+        destination_register = int(parts[0][1:])
+        source_register_1 = int(parts[1][1:])
+        source_register_2 = int(parts[2][1:])
+    except ValueError:
+        return None
+    
+    return Instruction(destination_register, source_register_1, source_register_2, SYMBOL_OPCODES[parts[3]])
+
+# Default number of architectural registers
+NUM_REGISTERS = 14
+
+# Scoreboard: registers with pending reads and writes of the issued instructions that have not retired
+# The pending registers are kept as integer bitmasks (bit r for register r) next to the read and write
+# counts, so a hazard check is an AND against the precomputed operand masks of the instruction and
+# checking if anything is in flight is a single comparison, whatever the number of registers.
+class Scoreboard:
+    
+    def __init__(self, num_registers=NUM_REGISTERS):
+        self.num_registers = num_registers
+        self.read_counts = [0] * num_registers
+        self.write_counts = [0] * num_registers
+        self.pending_reads = 0
+        self.pending_writes = 0
+    
+    # Mark the registers of an issued instruction as in use
+    def allocate(self, instruction):
+        self.read_counts[instruction.source_1] += 1
+        self.read_counts[instruction.source_2] += 1
+        self.write_counts[instruction.destination] += 1
+        self.pending_reads |= (1 << instruction.source_1) | (1 << instruction.source_2)
+        self.pending_writes |= 1 << instruction.destination
+    
+    # Release the registers of a retired instruction
+    def free(self, instruction):
+        for register in (instruction.source_1, instruction.source_2):
+            self.read_counts[register] -= 1
+            if self.read_counts[register] == 0:
+                self.pending_reads &= ~(1 << register)
+        
+        self.write_counts[instruction.destination] -= 1
+        if self.write_counts[instruction.destination] == 0:
+            self.pending_writes &= ~(1 << instruction.destination)
+    
+    # Check if an instruction has a dependency with the registers in use (RAW/WAW on a pending write, WAR on a pending read)
+    # operand_mask has the bits of all its registers and destination_mask the bit of its destination
+    def has_hazard(self, operand_mask, destination_mask):
+        return bool(self.pending_writes & operand_mask or self.pending_reads & destination_mask)
+    
+    # Check if there are registers in use
+    def in_use(self):
+        return (self.pending_reads | self.pending_writes) != 0
+
+# Function to get the operand masks of an instruction for the scoreboard (all its registers, destination)
+def operand_masks(instruction):
+    destination_mask = 1 << instruction.destination
+    return destination_mask | (1 << instruction.source_1) | (1 << instruction.source_2), destination_mask
+
+# Function to read the input file lazily, yielding one instruction at a time
+# Only the current line is kept in memory, so traces of any size can be streamed
+def iter_instructions_from_file(filename):
+    
+    # Binary traces are read from their records, without any parsing
+    if is_binary_trace(filename):
+        yield from BinaryTrace(filename)
+        return
+    
+    try:
+        with open(filename, 'r') as file:
+            for line in file:
+                
+                # Parse the instruction and check if it is valid
+                instruction = parse_instruction(line)
+                
+                if instruction is None:
+                    print(f"Ignoring invalid instruction: {line}")
+                    continue
+                
+                yield instruction
+                
+    # Handle file not found error
+    except FileNotFoundError:
+        print(f"File '{filename}' not found.")
+
+# Trace file that can be streamed any number of times, each iteration reads the file again
+class TraceFile:
+    
+    def __init__(self, filename):
+        self.filename = filename
+    
+    def __iter__(self):
+        return iter_instructions_from_file(self.filename)
+
+# Function to read the input file and return a list of instructions
+def read_instructions_from_file(filename):
+    return list(iter_instructions_from_file(filename))
+
+# Binary trace format: a header with the number of registers, the number of instructions and the latency of
+# each operation, followed by one packed little-endian record per instruction (destination, sources, operation)
+BINARY_MAGIC = b'ISRRBIN1'
+BINARY_HEADER_DTYPE = [('magic', 'S8'), ('num_registers', '<u4'), ('num_opcodes', '<u4'), ('num_instructions', '<u8'), ('latencies', 'u1', (8,))]
+BINARY_RECORD_DTYPE = [('destination', '<u2'), ('source_1', '<u2'), ('source_2', '<u2'), ('opcode', 'u1')]
+
+# Number of records converted to instructions at a time when a binary trace is read or written
+BINARY_CHUNK_SIZE = 65536
+
+# Function to check if a file is a binary trace
+def is_binary_trace(filename):
+    try:
+        with open(filename, 'rb') as file:
+            return file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    except OSError:
+        return False
+
+# Function to write instructions to a binary trace file, BINARY_CHUNK_SIZE instructions at a time
+# The format keeps one latency per operation, so all the instructions of an operation must have the same latency.
+# Returns the number of instructions written.
+def write_binary_trace(filename, instructions):
+    import numpy as np
+    
+    header = np.zeros(1, dtype=BINARY_HEADER_DTYPE)
+    latencies = {}
+    num_registers = 0
+    num_instructions = 0
+    
+    with open(filename, 'wb') as file:
+        
+        # Leave room for the header, it is written once the instructions are counted
+        file.write(header.tobytes())
+        
+        instructions = iter(instructions)
+        while True:
+            chunk = list(islice(instructions, BINARY_CHUNK_SIZE))
+            if not chunk:
+                break
+            
+            for instruction in chunk:
+                if latencies.setdefault(instruction.opcode, instruction.latency) != instruction.latency:
+                    raise ValueError(f"The binary format keeps one latency per operation, {OPCODE_SYMBOLS[instruction.opcode]} has several")
+                num_registers = max(num_registers, instruction.destination + 1, instruction.source_1 + 1, instruction.source_2 + 1)
+            if num_registers > 1 << 16:
+                raise ValueError("The binary format supports at most 65536 registers")
+            
+            records = np.array([(instruction.destination, instruction.source_1, instruction.source_2, instruction.opcode) for instruction in chunk],
+                               dtype=BINARY_RECORD_DTYPE)
+            file.write(records.tobytes())
+            num_instructions += len(chunk)
+        
+        # Operations that don't appear in the trace keep their default latency
+        table = [latencies.get(opcode, LATENCIES[opcode]) for opcode in Opcode]
+        if max(table) > 255:
+            raise ValueError("The binary format supports latencies of at most 255 cycles")
+        
+        header['magic'] = BINARY_MAGIC
+        header['num_registers'] = num_registers
+        header['num_opcodes'] = len(Opcode)
+        header['num_instructions'] = num_instructions
+        header['latencies'][0, :len(Opcode)] = table
+        file.seek(0)
+        file.write(header.tobytes())
+    
+    return num_instructions
+
+# Function to convert a text input file to a binary trace file, returns the number of instructions
+def convert_trace(text_filename, binary_filename):
+    return write_binary_trace(binary_filename, iter_instructions_from_file(text_filename))
+
+# Binary trace: the instructions of a binary trace file, memory-mapped as a NumPy structured array (records)
+# Nothing is parsed and no object is created per instruction when the file is opened: the operating system
+# reads the records when they are used, and instructions are only built while iterating.
+class BinaryTrace:
+    
+    def __init__(self, filename):
+        import numpy as np
+        
+        header = np.fromfile(filename, dtype=BINARY_HEADER_DTYPE, count=1)
+        if len(header) == 0 or header['magic'][0] != BINARY_MAGIC:
+            raise ValueError(f"{filename!r} is not a binary trace")
+        if header['num_opcodes'][0] != len(Opcode):
+            raise ValueError(f"{filename!r} was written with {header['num_opcodes'][0]} operations, expected {len(Opcode)}")
+        
+        self.filename = filename
+        self.num_registers = int(header['num_registers'][0])
+        self.latencies = {opcode: int(header['latencies'][0, opcode]) for opcode in Opcode}
+        
+        # An empty file region can't be memory-mapped
+        num_instructions = int(header['num_instructions'][0])
+        if num_instructions == 0:
+            self.records = np.zeros(0, dtype=BINARY_RECORD_DTYPE)
+        else:
+            self.records = np.memmap(filename, dtype=BINARY_RECORD_DTYPE, mode='r', offset=header.itemsize, shape=(num_instructions,))
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def __getitem__(self, index):
+        destination, source_1, source_2, opcode = self.records[index].tolist()
+        opcode = Opcode(opcode)
+        return Instruction(destination, source_1, source_2, opcode, self.latencies[opcode])
+    
+    # Build the instructions one chunk of records at a time
+    # Instructions are immutable, so the records with the same registers and operation share one instruction.
+    def __iter__(self):
+        opcodes = list(Opcode)
+        latencies = [self.latencies[opcode] for opcode in opcodes]
+        instructions = {}
+        for start in range(0, len(self.records), BINARY_CHUNK_SIZE):
+            
+            # Traces with many registers rarely repeat an instruction, don't keep them all
+            if len(instructions) > BINARY_CHUNK_SIZE:
+                instructions.clear()
+            
+            for record in self.records[start:start + BINARY_CHUNK_SIZE].tolist():
+                instruction = instructions.get(record)
+                if instruction is None:
+                    destination, source_1, source_2, opcode = record
+                    instruction = instructions[record] = Instruction(destination, source_1, source_2, opcodes[opcode], latencies[opcode])
+                yield instruction
+    
+    # Worker processes map the file again instead of receiving the records
+    def __reduce__(self):
+        return (BinaryTrace, (self.filename,))
+    
+    # Latency of each instruction as a NumPy array
+    def latency_array(self):
+        import numpy as np
+        
+        return np.array([self.latencies[opcode] for opcode in Opcode], dtype=np.uint8)[self.records['opcode']]
+
+# Function to print the instructions in a readable format using pandas
+def print_instructions(instructions):
+    import pandas as pd
+    
+    rows = [[f"r{instruction.destination}", f"r{instruction.source_1}", f"r{instruction.source_2}", OPCODE_SYMBOLS[instruction.opcode], instruction.latency]
+            for instruction in instructions]
+    df = pd.DataFrame(rows, columns=['Destination', 'Source 1', 'Source 2', 'Operation', 'Cycles'])
+    print(df)
+    
+# Function to format an issued instruction for the output table
+def format_instruction(instruction, number):
+    
+    # Handle load and store instructions for visual purposes
+    if instruction.opcode == Opcode.LOAD:
+        return f"{number}. r{instruction.source_2} = Load "
+    elif instruction.opcode == Opcode.STORE:
+        return f"{number}. Store = r{instruction.destination} "
+    else:
+        return f"{number}. r{instruction.destination} = r{instruction.source_1} {OPCODE_SYMBOLS[instruction.opcode]} r{instruction.source_2} "
+
+# Function to build the dependency graph of the instructions
+# The RAW, WAR and WAW dependencies are found in linear time
+# using the last instruction that wrote each register and the instructions that read it since then.
+# Returns the instructions that depend on each instruction and the number of instructions each one waits for.
+def build_dependency_graph(instructions):
+    
+    # Initialize the graph
+    num_instructions = len(instructions)
+    successors = [[] for k in range(num_instructions)]
+    num_predecessors = [0] * num_instructions
+    
+    # Last instruction that wrote each register and instructions that read it since then
+    last_writer = {}
+    readers = {}
+    
+    for k in range(num_instructions):
+        
+        # Get the destination and source registers
+        destination_register = instructions[k].destination
+        source_register_1 = instructions[k].source_1
+        source_register_2 = instructions[k].source_2
+        
+        predecessors = set()
+        
+        # RAW dependencies
+        if source_register_1 in last_writer:
+            predecessors.add(last_writer[source_register_1])
+        if source_register_2 in last_writer:
+            predecessors.add(last_writer[source_register_2])
+        
+        # WAW dependency
+        if destination_register in last_writer:
+            predecessors.add(last_writer[destination_register])
+        
+        # WAR dependencies
+        predecessors.update(readers.get(destination_register, []))
+        
+        # Add the edges
+        for predecessor in predecessors:
+            successors[predecessor].append(k)
+        num_predecessors[k] = len(predecessors)
+        
+        # Update the last readers and writer
+        readers.setdefault(source_register_1, []).append(k)
+        if source_register_2 != source_register_1:
+            readers.setdefault(source_register_2, []).append(k)
+        last_writer[destination_register] = k
+        readers[destination_register] = []
+    
+    # Sort the dependent instructions in program order
+    for k in range(num_instructions):
+        successors[k].sort()
+    
+    return successors, num_predecessors
+   
+# Parsed trace: immutable sequence of instructions that can be shared by any number of runs
+# The dependency graph is built the first time it is needed and reused afterwards.
+class ParsedTrace:
+    __slots__ = ('instructions', '_dependency_graph', '_operand_masks', '_digest')
+    
+    def __init__(self, instructions):
+        self.instructions = tuple(instructions)
+        self._dependency_graph = None
+        self._operand_masks = None
+        self._digest = None
+    
+    # Read a trace from an input file
+    @classmethod
+    def from_file(cls, filename):
+        return cls(iter_instructions_from_file(filename))
+    
+    def __len__(self):
+        return len(self.instructions)
+    
+    def __getitem__(self, index):
+        return self.instructions[index]
+    
+    def __iter__(self):
+        return iter(self.instructions)
+    
+    def __reduce__(self):
+        return (ParsedTrace, (self.instructions,))
+    
+    # Instructions that depend on each instruction and number of instructions each one waits for
+    @property
+    def dependency_graph(self):
+        if self._dependency_graph is None:
+            successors, num_predecessors = build_dependency_graph(self.instructions)
+            self._dependency_graph = (tuple(tuple(k) for k in successors), tuple(num_predecessors))
+        return self._dependency_graph
+    
+    # Scoreboard operand masks of each instruction
+    @property
+    def operand_masks(self):
+        if self._operand_masks is None:
+            self._operand_masks = tuple(operand_masks(instruction) for instruction in self.instructions)
+        return self._operand_masks
+    
+    # Hash of the contents of the trace (registers, operations and latencies of every instruction)
+    @property
+    def digest(self):
+        if self._digest is None:
+            fields = array('q', [field for instruction in self.instructions
+                                 for field in (instruction.destination, instruction.source_1, instruction.source_2, instruction.opcode, instruction.latency)])
+            self._digest = hashlib.sha256(fields.tobytes()).hexdigest()
+        return self._digest
+    
+    # Number of registers used by the trace (highest register number plus one)
+    @property
+    def num_registers(self):
+        return count_registers(self.instructions)
+
+# Function to count the registers used by instructions from any iterable (highest register number plus one)
+def count_registers(instructions):
+    return max((max(instruction.destination, instruction.source_1, instruction.source_2) + 1 for instruction in instructions), default=0)
+
+# Function to get a parsed trace from a parsed trace or any sequence of instructions
+def as_parsed_trace(instructions):
+    if isinstance(instructions, ParsedTrace):
+        return instructions
+    return ParsedTrace(instructions)
+
+# Run context: mutable state of one run of a cycle-by-cycle scheduler over a parsed trace
+# (cycles left to complete, retired flags and number of instructions each one still waits for)
+class RunContext:
+    
+    def __init__(self, trace):
+        num_instructions = len(trace)
+        self.cycles = [instruction.latency for instruction in trace]
+        self.retired = [False] * num_instructions
+        self.successors, num_predecessors = trace.dependency_graph
+        self.num_predecessors = list(num_predecessors)
+
+# Function to create the scoreboard of a run of a cycle-by-cycle scheduler
+# num_registers defaults to NUM_REGISTERS, or more if the trace uses more registers
+def create_scoreboard(trace, num_registers=None):
+    if num_registers is None:
+        return Scoreboard(max(NUM_REGISTERS, trace.num_registers))
+    if num_registers < trace.num_registers:
+        raise ValueError(f"The trace uses {trace.num_registers} registers, more than {num_registers}")
+    return Scoreboard(num_registers)
+
+# Reorder buffer: fixed-capacity circular array of instructions indexed by program order
+# Instructions are allocated at the tail in program order and retired from the head, so
+# retirement only touches the instructions that actually retire.
+class ReorderBuffer:
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = [None] * capacity
+        
+        # Program number of the oldest instruction and of the next instruction to allocate
+        self.head = 0
+        self.tail = 0
+    
+    def __len__(self):
+        return self.tail - self.head
+    
+    def is_full(self):
+        return self.tail - self.head == self.capacity
+    
+    def is_empty(self):
+        return self.tail == self.head
+    
+    # Add the next instruction in program order
+    def allocate(self, entry):
+        if self.is_full():
+            raise IndexError("Reorder buffer is full")
+        self.entries[self.tail % self.capacity] = entry
+        self.tail += 1
+    
+    # Get the oldest instruction
+    def peek(self):
+        return self.entries[self.head % self.capacity]
+    
+    # Remove the oldest instruction
+    def pop(self):
+        if self.is_empty():
+            raise IndexError("Reorder buffer is empty")
+        slot = self.head % self.capacity
+        entry = self.entries[slot]
+        self.entries[slot] = None
+        self.head += 1
+        return entry
+
+# Issue window: instructions that entered the processor in program order and wait to be issued
+# An instruction wakes up when the last instruction it depends on retires and goes to a ready queue
+# ordered by age, the oldest ready instructions are selected first. Issuing frees its window slot,
+# so the cost of a cycle depends on the issue width, not on the length of the trace.
+class IssueWindow:
+    
+    def __init__(self, capacity=None):
+        if capacity is not None and capacity < 1:
+            raise ValueError("The issue window size must be at least 1")
+        self.capacity = capacity
+        
+        # Ready instructions (program numbers) and number of instructions waiting in the window
+        self.ready = []
+        self.num_waiting = 0
+        
+        # Program number of the next instruction to enter the window
+        self.tail = 0
+    
+    def __len__(self):
+        return self.num_waiting
+    
+    def is_full(self):
+        return self.capacity is not None and self.num_waiting == self.capacity
+    
+    # Add the next instruction in program order, ready if it does not wait for any instruction
+    def dispatch(self, k, ready):
+        if self.is_full():
+            raise IndexError("Issue window is full")
+        self.tail += 1
+        self.num_waiting += 1
+        if ready:
+            heapq.heappush(self.ready, k)
+    
+    # Mark an instruction as ready, the instructions that did not enter the window yet are checked when they do
+    def wakeup(self, k):
+        if k < self.tail:
+            heapq.heappush(self.ready, k)
+    
+    # Remove up to count ready instructions from the window, oldest first
+    def select(self, count):
+        selected = []
+        while self.ready and len(selected) < count:
+            selected.append(heapq.heappop(self.ready))
+        self.num_waiting -= len(selected)
+        return selected
+
+# Kinds of events saved in a schedule trace
+EVENT_ISSUE = 0
+EVENT_RETIRE = 1
+
+# Schedule trace: compact record of the issue and retire events of a run
+# Events are saved as integers (cycle, instruction index, kind) in preallocated arrays that double
+# in size when they are full. The dataframe and the human-readable strings are only built on request.
+class ScheduleTrace:
+    
+    def __init__(self, capacity=0):
+        self.size = 0
+        self.num_cycles = 0
+        self.cycles = array('q', bytes(8 * capacity))
+        self.instructions = array('q', bytes(8 * capacity))
+        self.kinds = array('b', bytes(capacity))
+    
+    def __len__(self):
+        return self.size
+    
+    # Save an event
+    def record(self, cycle, instruction, kind):
+        
+        # Double the size of the arrays if they are full
+        if self.size == len(self.kinds):
+            extra = max(len(self.kinds), 16)
+            self.cycles.frombytes(bytes(8 * extra))
+            self.instructions.frombytes(bytes(8 * extra))
+            self.kinds.frombytes(bytes(extra))
+        
+        self.cycles[self.size] = cycle
+        self.instructions[self.size] = instruction
+        self.kinds[self.size] = kind
+        self.size += 1
+        
+        if cycle > self.num_cycles:
+            self.num_cycles = cycle
+    
+    # Pack the events in bytes, for storage
+    def to_bytes(self):
+        return self.cycles[:self.size].tobytes() + self.instructions[:self.size].tobytes() + self.kinds[:self.size].tobytes()
+    
+    # Unpack the events packed by to_bytes
+    @classmethod
+    def from_bytes(cls, data, num_cycles):
+        size = len(data) // 17
+        trace = cls()
+        trace.cycles = array('q', data[:8 * size])
+        trace.instructions = array('q', data[8 * size:16 * size])
+        trace.kinds = array('b', data[16 * size:])
+        trace.size = size
+        trace.num_cycles = num_cycles
+        return trace
+    
+    # Build the totals of the run
+    def summarize(self, num_units):
+        summary = ScheduleSummary(num_units)
+        for e in range(self.size):
+            summary.record(self.cycles[e], self.instructions[e], self.kinds[e])
+        summary.num_cycles = self.num_cycles
+        return summary
+    
+    # Send the events to an observer (such as a ScheduleSink) cycle by cycle, as if the run was happening
+    def replay(self, observer):
+        cycle = None
+        issued = []
+        retired = []
+        
+        for e in sorted(range(self.size), key=self.cycles.__getitem__):
+            if self.cycles[e] != cycle:
+                if cycle is not None:
+                    observer.on_cycle(cycle, issued, retired)
+                cycle = self.cycles[e]
+                issued = []
+                retired = []
+            
+            k = self.instructions[e]
+            if self.kinds[e] == EVENT_ISSUE:
+                issued.append(k)
+                observer.on_issue(cycle, k)
+            else:
+                retired.append(k)
+                observer.on_retire(cycle, k)
+        
+        if cycle is not None:
+            observer.on_cycle(cycle, issued, retired)
+    
+    # Build the instructions issued and retired strings of every cycle
+    def to_strings(self, instructions):
+        issued = [[] for c in range(self.num_cycles + 1)]
+        retired = [[] for c in range(self.num_cycles + 1)]
+        
+        for e in range(self.size):
+            k = self.instructions[e]
+            if self.kinds[e] == EVENT_ISSUE:
+                issued[self.cycles[e]].append(format_instruction(instructions[k], k+1))
+            else:
+                retired[self.cycles[e]].append(f"{k+1}. ")
+        
+        return [''.join(parts) for parts in issued[1:]], [''.join(parts) for parts in retired[1:]]
+    
+    # Build the dataframe with a row for every cycle
+    def to_dataframe(self, instructions):
+        import pandas as pd
+        
+        issued, retired = self.to_strings(instructions)
+        return pd.DataFrame({
+            'Cycle': [None] + list(range(1, self.num_cycles + 1)),
+            'Instructions Issued': [''] + issued,
+            'Retired': [''] + retired,
+        })
+
+# Schedule summary: running aggregates of a run, kept instead of the events when only the totals are needed
+# It has the same record interface as ScheduleTrace, but its memory does not grow with the trace length.
+# The latency of an instruction is the number of cycles from its issue to its retirement, so the sum of the
+# latencies is the sum of the retire cycles minus the sum of the issue cycles.
+class ScheduleSummary:
+    __slots__ = ('num_units', 'num_cycles', 'num_issued', 'num_retired', 'issue_cycles_total', 'retire_cycles_total')
+    
+    def __init__(self, num_units):
+        self.num_units = num_units
+        self.num_cycles = 0
+        self.num_issued = 0
+        self.num_retired = 0
+        self.issue_cycles_total = 0
+        self.retire_cycles_total = 0
+    
+    # Add an event
+    def record(self, cycle, instruction, kind):
+        if kind == EVENT_ISSUE:
+            self.num_issued += 1
+            self.issue_cycles_total += cycle
+        else:
+            self.num_retired += 1
+            self.retire_cycles_total += cycle
+        
+        if cycle > self.num_cycles:
+            self.num_cycles = cycle
+    
+    # Add the instructions issued and retired in a cycle
+    def record_cycle(self, cycle, num_issued, num_retired):
+        self.num_issued += num_issued
+        self.issue_cycles_total += cycle * num_issued
+        self.num_retired += num_retired
+        self.retire_cycles_total += cycle * num_retired
+        
+        if cycle > self.num_cycles:
+            self.num_cycles = cycle
+    
+    # Instructions retired per cycle
+    @property
+    def ipc(self):
+        return self.num_retired / self.num_cycles if self.num_cycles > 0 else 0.0
+    
+    # Share of the issue slots that were used
+    @property
+    def utilization(self):
+        return self.num_issued / (self.num_cycles * self.num_units) if self.num_cycles > 0 else 0.0
+    
+    # Average number of cycles from issue to retirement
+    @property
+    def average_latency(self):
+        return (self.retire_cycles_total - self.issue_cycles_total) / self.num_retired if self.num_retired > 0 else 0.0
+
+# Function for scheduling instructions with single instruction/superscalar, in-order execution
+def in_order_execution(instructions, num_units, as_trace=False, num_registers=None, summary=False):
+    
+    # Initialize variables
+    instructions = as_parsed_trace(instructions)
+    context = RunContext(instructions)
+    scoreboard = create_scoreboard(instructions, num_registers)
+    masks = instructions.operand_masks
+    cycle = 0
+    num_instructions = len(instructions)
+    done = False
+    
+    # Save the issue and retire events of the instructions, or only their totals
+    trace = ScheduleSummary(num_units) if summary else ScheduleTrace(2 * num_instructions)
+    
+    # Initialize the instructions issued and retired lists (program numbers)
+    instructions_issued = []
+    instructions_retired = []
+    
+    # Start scheduling
+    while not done:
+        
+        # Issue up to num_units instructions per cycle
+        for i in range(num_units):
+            
+            # check if there is a dependency with the next instruction
+            bool_dependency = False
+            
+            try:
+                bool_dependency = scoreboard.has_hazard(*masks[len(instructions_issued)])
+            except IndexError:
+                bool_dependency = True
+                
+            # if there is no dependency, issue the instruction
+            if not bool_dependency:
+                
+                # Add the instruction to the instructions issued list
+                last_instruction = len(instructions_issued)
+                instructions_issued.append(last_instruction)
+                
+                # Save the issue event
+                trace.record(cycle + 1, last_instruction, EVENT_ISSUE)
+                
+                # Update registers
+                scoreboard.allocate(instructions[last_instruction])
+                
+        # Check if a instruction can be retired
+        for j in instructions_issued:
+            
+            if (context.cycles[j] < 1 and not context.retired[j] and (j == 0 or context.retired[j-1])):
+                
+                # Update variables and arrays, and save the retire event
+                trace.record(cycle + 1, j, EVENT_RETIRE)
+                context.retired[j] = True
+                instructions_retired.append(j)
+                
+                # Update registers
+                scoreboard.free(instructions[j])
+                  
+        # Update the number of cycles to complete the instruction
+        for k in instructions_issued:
+            
+            # If the instruction is not completed, subtract 1 from the number of cycles to complete it
+            if context.cycles[k] > 0:
+                context.cycles[k] -= 1
+            
+        # Update the cycle counter
+        cycle += 1
+        
+        # Check if there are instructions running
+        reg_in_use = scoreboard.in_use()
+            
+        # If there are no instructions running, and all instructions have been retired, then we are done
+        if not reg_in_use and len(instructions_retired) == num_instructions:
+            done = True
+        
+    trace.num_cycles = cycle
+    
+    # Return the schedule trace (or summary) or the dataframe
+    if as_trace or summary:
+        return trace
+    return trace.to_dataframe(instructions)
+ 
+# Function for scheduling instructions with superscalar, out-of-order issue, in-order retirement
+# Only the instructions in the reorder buffer can be issued, rob_size defaults to the number of instructions.
+# issue_window limits the instructions waiting to be issued, by default there is no limit.
+def out_of_order_issue_in_order_retirement(instructions, num_units, rob_size=None, as_trace=False, num_registers=None, summary=False,
+                                           issue_window=None):
+    
+    # Initialize variables
+    instructions = as_parsed_trace(instructions)
+    context = RunContext(instructions)
+    scoreboard = create_scoreboard(instructions, num_registers)
+    cycle = 0
+    num_instructions = len(instructions)
+    done = False
+    
+    # Save the issue and retire events of the instructions, or only their totals
+    trace = ScheduleSummary(num_units) if summary else ScheduleTrace(2 * num_instructions)
+    
+    # Initialize the reorder buffer
+    if rob_size is None:
+        rob_size = max(num_instructions, 1)
+    rob = ReorderBuffer(rob_size)
+    window = IssueWindow(issue_window)
+    
+    # Initialize the instructions executing and retired lists (program numbers)
+    instructions_executing = []
+    instructions_retired = []
+    
+    # Start scheduling
+    while not done:
+        
+        # Fill the reorder buffer and the issue window in program order
+        while rob.tail < num_instructions and not rob.is_full() and not window.is_full():
+            window.dispatch(rob.tail, context.num_predecessors[rob.tail] == 0)
+            rob.allocate(rob.tail)
+        
+        # Issue up to num_units of the oldest instructions whose dependencies have all retired
+        for k in window.select(num_units):
+            
+            # Add the instruction to the instructions executing list
+            instructions_executing.append(k)
+            
+            # Save the issue event
+            trace.record(cycle + 1, k, EVENT_ISSUE)
+            
+            # Update registers
+            scoreboard.allocate(instructions[k])
+
+        # Retire from the head of the reorder buffer, only allow in order retirement
+        while not rob.is_empty() and context.cycles[rob.peek()] < 1:
+            
+            # Update variables and arrays, and save the retire event
+            k = rob.pop()
+            trace.record(cycle + 1, k, EVENT_RETIRE)
+            context.retired[k] = True
+            instructions_retired.append(k)
+            
+            # Update registers
+            scoreboard.free(instructions[k])
+            
+            # Wake up the instructions that depend on it
+            for successor in context.successors[k]:
+                context.num_predecessors[successor] -= 1
+                if context.num_predecessors[successor] == 0:
+                    window.wakeup(successor)
+        
+        # Update the number of cycles to complete the instructions, the completed ones wait in the reorder buffer
+        for k in instructions_executing:
+            context.cycles[k] -= 1
+        instructions_executing = [k for k in instructions_executing if context.cycles[k] > 0]
+            
+        # Update the cycle counter
+        cycle += 1
+        
+        # Check if there are instructions running
+        reg_in_use = scoreboard.in_use()
+        
+        # If there are no instructions running, and all instructions have been retired, then we are done
+        if not reg_in_use and len(instructions_retired) == num_instructions:
+            done = True
+        
+    trace.num_cycles = cycle
+    
+    # Return the schedule trace (or summary) or the dataframe
+    if as_trace or summary:
+        return trace
+    return trace.to_dataframe(instructions)
+
+# Function for scheduling instructions with superscalar, out-of-order issue and retirement
+# issue_window limits the instructions waiting to be issued, by default there is no limit.
+def out_of_order_issue_and_retirement(instructions, num_units, as_trace=False, num_registers=None, summary=False, issue_window=None):
+    
+    # Initialize variables
+    instructions = as_parsed_trace(instructions)
+    context = RunContext(instructions)
+    scoreboard = create_scoreboard(instructions, num_registers)
+    cycle = 0
+    num_instructions = len(instructions)
+    done = False
+    
+    # Save the issue and retire events of the instructions, or only their totals
+    trace = ScheduleSummary(num_units) if summary else ScheduleTrace(2 * num_instructions)
+    
+    window = IssueWindow(issue_window)
+    
+    # Initialize the instructions executing and retired lists (program numbers)
+    instructions_executing = []
+    instructions_retired = []
+    
+    # Start scheduling
+    while not done:
+        
+        # Fill the issue window in program order
+        while window.tail < num_instructions and not window.is_full():
+            window.dispatch(window.tail, context.num_predecessors[window.tail] == 0)
+        
+        # Issue up to num_units of the oldest instructions whose dependencies have all retired
+        for k in window.select(num_units):
+            
+            # Add the instruction to the instructions executing list
+            instructions_executing.append(k)
+            
+            # Save the issue event
+            trace.record(cycle + 1, k, EVENT_ISSUE)
+            
+            # Update registers
+            scoreboard.allocate(instructions[k])
+                
+        # Retire the completed instructions, in the order they were issued
+        for k in instructions_executing:
+            
+            if context.cycles[k] < 1:
+                
+                # Update variables and arrays, and save the retire event
+                trace.record(cycle + 1, k, EVENT_RETIRE)
+                context.retired[k] = True
+                instructions_retired.append(k)
+                
+                # Update registers
+                scoreboard.free(instructions[k])
+                
+                # Wake up the instructions that depend on it
+                for successor in context.successors[k]:
+                    context.num_predecessors[successor] -= 1
+                    if context.num_predecessors[successor] == 0:
+                        window.wakeup(successor)
+        
+        # Update the number of cycles to complete the instructions still executing
+        instructions_executing = [k for k in instructions_executing if not context.retired[k]]
+        for k in instructions_executing:
+            context.cycles[k] -= 1
+            
+        # Update the cycle counter
+        cycle += 1
+        
+        # Check if there are instructions running
+        reg_in_use = scoreboard.in_use()
+            
+        # If there are no instructions running, and all instructions have been retired, then we are done
+        if not reg_in_use and len(instructions_retired) == num_instructions:
+            done = True
+        
+    trace.num_cycles = cycle
+    
+    # Return the schedule trace (or summary) or the dataframe
+    if as_trace or summary:
+        return trace
+    return trace.to_dataframe(instructions)
+
+# Register renaming stage: maps the architectural registers to a pool of physical registers
+# Architectural register r starts mapped to physical register r, the others are in the free list.
+# Every instruction gets a new physical register for its destination, which removes the WAR and WAW
+# dependencies. A physical register is reclaimed once it is no longer mapped, the instruction that
+# wrote it has retired and all the instructions that read it have retired.
+class RegisterRenamer:
+    
+    def __init__(self, num_physical, num_architectural=None):
+        if num_architectural is None:
+            num_architectural = NUM_REGISTERS
+        if num_physical <= num_architectural:
+            raise ValueError(f"The number of physical registers must be greater than the number of architectural registers ({num_architectural})")
+        
+        self.num_architectural = num_architectural
+        self.num_physical = num_physical
+        
+        # Rename table and free list
+        self.table = list(range(num_architectural))
+        self.free = list(range(num_physical - 1, num_architectural - 1, -1))
+        
+        # State of the physical registers: mapped by the rename table, instructions reading them
+        # that have not retired, and whether the instruction writing them has not retired
+        self.mapped = [k < num_architectural for k in range(num_physical)]
+        self.pending_readers = [0] * num_physical
+        self.pending_writer = [False] * num_physical
+    
+        # Whether each physical register is in the free list, so reclaiming one doesn't search the list
+        self.is_free = [k >= num_architectural for k in range(num_physical)]
+    
+    # Check if there is a free physical register for the next instruction
+    def can_rename(self):
+        return len(self.free) > 0
+    
+    # Rename an instruction, returns the physical destination and source registers
+    def rename(self, instruction):
+        for register in (instruction.destination, instruction.source_1, instruction.source_2):
+            if register >= self.num_architectural:
+                raise ValueError(f"r{register} is not an architectural register (there are {self.num_architectural})")
+        
+        # Read the sources before the destination is remapped
+        source_register_1 = self.table[instruction.source_1]
+        source_register_2 = self.table[instruction.source_2]
+        self.pending_readers[source_register_1] += 1
+        self.pending_readers[source_register_2] += 1
+        
+        # Map the destination to a free register and release the previous one
+        destination_register = self.free.pop()
+        self.is_free[destination_register] = False
+        previous = self.table[instruction.destination]
+        self.table[instruction.destination] = destination_register
+        self.mapped[destination_register] = True
+        self.pending_writer[destination_register] = True
+        self.mapped[previous] = False
+        self.reclaim(previous)
+        
+        return destination_register, source_register_1, source_register_2
+    
+    # Update the physical registers of a retired instruction
+    def retire(self, destination_register, source_register_1, source_register_2):
+        self.pending_writer[destination_register] = False
+        self.pending_readers[source_register_1] -= 1
+        self.pending_readers[source_register_2] -= 1
+        self.reclaim(destination_register)
+        self.reclaim(source_register_1)
+        self.reclaim(source_register_2)
+    
+    # Put a physical register back in the free list if nothing uses it anymore
+    def reclaim(self, register):
+        if not self.mapped[register] and not self.pending_writer[register] and self.pending_readers[register] == 0 and not self.is_free[register]:
+            self.free.append(register)
+            self.is_free[register] = True
+
+# Reasons of the issue slots lost in a cycle: the kind of dependency the oldest instruction waiting to issue has
+# with an instruction not retired yet, no room to bring more instructions into the window, no free physical
+# register to rename the next instruction, the oldest waiting instruction is ready but its unit pool has no free
+# unit, or nothing left to issue at the end of the trace. These reasons add up to the lost issue slots.
+# Structural stalls are counted apart, in ready instructions instead of slots: the ready instructions left over
+# when all the issue slots were used.
+STALL_RAW = 'raw'
+STALL_WAR = 'war'
+STALL_WAW = 'waw'
+STALL_STRUCTURAL = 'structural'
+STALL_UNIT_BUSY = 'unit_busy'
+STALL_WINDOW_FULL = 'window_full'
+STALL_RENAME = 'rename'
+STALL_DRAIN = 'drain'
+STALL_REASONS = (STALL_RAW, STALL_WAR, STALL_WAW, STALL_UNIT_BUSY, STALL_WINDOW_FULL, STALL_RENAME, STALL_DRAIN, STALL_STRUCTURAL)
+
+# Kinds of a dependency between two instructions (bits, an instruction can depend on another in several ways)
+DEPENDENCY_RAW = 1
+DEPENDENCY_WAR = 2
+DEPENDENCY_WAW = 4
+
+# Observer of an event-driven scheduler, its methods are called while the scheduler runs
+# Subclass it and override the methods needed. Without an observer the scheduler makes no calls at all.
+class SchedulerObserver:
+    
+    # Called after every processed cycle (starting at 1) with the instructions issued and retired
+    def on_cycle(self, cycle, issued, retired):
+        pass
+    
+    # Called for every instruction issued
+    def on_issue(self, cycle, k):
+        pass
+    
+    # Called for every instruction retired
+    def on_retire(self, cycle, k):
+        pass
+    
+    # Called with the issue slots lost in a cycle and their reason, including the idle cycles skipped
+    # after it (only when the scheduler counts the stalls)
+    def on_stall(self, cycle, reason, slots):
+        pass
+
+# Event-driven scheduler
+# Instead of stepping every cycle, the scheduler keeps a priority queue of completion times and
+# jumps straight to the next cycle where an instruction can issue or retire, so the work per cycle
+# is proportional to the instructions in flight.
+# Instructions are pulled from any iterable (a list or a generator such as iter_instructions_from_file)
+# into a window in program order, at most window_size instructions that have not retired yet are kept
+# (the reorder buffer in the modes with in-order retirement). The dependencies of each instruction are
+# found when it enters the window, against the last writer and readers of its registers, and the
+# instruction is dropped as soon as it retires, so memory does not grow with the trace length.
+# With physical_registers, the instructions go through a RegisterRenamer when they enter the window and
+# the window stops filling while there is no free physical register. architectural_registers defaults to
+# NUM_REGISTERS, or the registers used by the trace if it knows them (a parsed or binary trace) and uses more. With issue_window, it also stops filling
+# while that many instructions wait to be issued (out-of-order issue only).
+# unit_pools maps unit classes (see UNIT_CLASSES) to a FunctionalUnitPool: each cycle, the instructions of a class
+# can only issue to a free unit of its pool, and the pool latency replaces the latency of the instructions. The
+# classes without a pool are only limited by num_units, which stays the issue width.
+# count_stalls classifies every lost issue slot in stalls (see STALL_REASONS), time_phases adds up the time
+# spent in the dispatch, issue and retire phases in phase_times, and observer gets a call for every cycle
+# and event. All of them are off by default and cost nothing then.
+# The instructions are not modified.
+class EventDrivenScheduler:
+    
+    def __init__(self, instructions, num_units, mode, window_size=None, physical_registers=None,
+                 count_stalls=False, time_phases=False, observer=None, issue_window=None, unit_pools=None, architectural_registers=None):
+        if window_size is not None and window_size < 1:
+            raise ValueError("The window size must be at least 1")
+        if issue_window is not None and issue_window < 1:
+            raise ValueError("The issue window size must be at least 1")
+        if unit_pools is not None:
+            check_unit_pools(unit_pools)
+        
+        self.source = iter(instructions)
+        self.num_units = num_units
+        self.window_size = window_size
+        self.mode = mode
+        self.out_of_order_issue = mode != MODE_IN_ORDER
+        self.out_of_order_retirement = mode == MODE_OOO_RETIREMENT
+        
+        # Instructions in the window by program index: [instruction, destination, source 1, source 2,
+        # latency, number of instructions it waits for, instructions that depend on it, completed, issued,
+        # number of RAW, WAR and WAW dependencies it waits for (only when counting stalls), unit class (only with unit pools)]
+        self.window = {}
+        self.num_fetched = 0
+        self.exhausted = False
+        
+        # Maximum and current number of instructions in the window waiting to be issued
+        self.issue_window = issue_window if self.out_of_order_issue else None
+        self.num_waiting = 0
+        
+        # Register renaming stage and instruction waiting for a free physical register
+        self.renamer = None
+        if physical_registers is not None:
+            if architectural_registers is None:
+                architectural_registers = max(NUM_REGISTERS, getattr(instructions, 'num_registers', 0))
+            self.renamer = RegisterRenamer(physical_registers, architectural_registers)
+        self.stalled_instruction = None
+        
+        # Last instruction in the window that writes each register and instructions that read it since then
+        self.last_writer = {}
+        self.readers = {}
+        
+        # Ready instructions ordered by age for out-of-order issue, next instruction for in-order issue
+        # and oldest instruction not retired yet for in-order retirement
+        self.ready = []
+        self.next_instruction = 0
+        self.head = 0
+        
+        # Functional unit pools, with the ready instructions of each class ordered by age, the completion cycles of
+        # the busy non-pipelined units, and by class the instructions issued, the cycles the units were busy and
+        # the ready instructions left without a unit in each cycle
+        self.unit_pools = unit_pools
+        self.class_ready = None
+        if unit_pools is not None:
+            self.class_ready = {unit_class: [] for unit_class in UNIT_CLASSES}
+            self.busy_units = {unit_class: [] for unit_class in UNIT_CLASSES}
+            self.unit_issued = dict.fromkeys(UNIT_CLASSES, 0)
+            self.unit_busy_cycles = dict.fromkeys(UNIT_CLASSES, 0)
+            self.unit_blocked = dict.fromkeys(UNIT_CLASSES, 0)
+        self.pool_blocked = False
+        
+        # Priority queue of (completion cycle, issue order, instruction)
+        self.in_flight = []
+        self.issue_order = 0
+        
+        # Current cycle (starting at 0) and whether it has to be processed
+        self.cycle = 0
+        self.num_retired = 0
+        self.done = False
+        
+        # Lost issue slots by reason, kinds of the dependencies in the window and oldest instruction not issued yet
+        self.stalls = None
+        self.dependency_kinds = None
+        self.oldest_not_issued = 0
+        if count_stalls:
+            self.stalls = dict.fromkeys(STALL_REASONS, 0)
+            self.dependency_kinds = {}
+        
+        # Time spent in each phase, the phases are wrapped only when they are timed
+        self.phase_times = None
+        if time_phases:
+            self.phase_times = {'dispatch': 0.0, 'issue': 0.0, 'retire': 0.0}
+            self.dispatch = self.timed_phase('dispatch', self.dispatch)
+            self.issue = self.timed_phase('issue', self.issue)
+            self.retire = self.timed_phase('retire', self.retire)
+        
+        self.observer = observer
+    
+    # State saved in a checkpoint: everything but the source of the instructions, the observer and the timed phases
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('source', 'observer', 'dispatch', 'issue', 'retire'):
+            state.pop(name, None)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.source = iter(())
+        self.observer = None
+        if self.phase_times is not None:
+            self.dispatch = self.timed_phase('dispatch', self.dispatch)
+            self.issue = self.timed_phase('issue', self.issue)
+            self.retire = self.timed_phase('retire', self.retire)
+    
+    # Continue a restored scheduler on the same instructions, skipping the ones already brought into the window
+    # The number of functional units and the window size can be changed for the rest of the run.
+    def resume(self, instructions, num_units=None, window_size=None, observer=None):
+        if num_units is not None:
+            if num_units < 1:
+                raise ValueError("The number of functional units must be at least 1")
+            self.num_units = num_units
+        if window_size is not None:
+            if window_size < 1:
+                raise ValueError("The window size must be at least 1")
+            self.window_size = window_size
+        
+        # The instruction waiting for a physical register was already taken from the source
+        consumed = self.num_fetched + (self.stalled_instruction is not None)
+        self.source = iter(instructions)
+        next(islice(self.source, consumed, consumed), None)
+        self.observer = observer
+    
+    # Wrap a phase to add up the time spent in it
+    def timed_phase(self, name, phase):
+        def timed(*args):
+            start = time.perf_counter()
+            result = phase(*args)
+            self.phase_times[name] += time.perf_counter() - start
+            return result
+        return timed
+    
+    def __iter__(self):
+        while True:
+            events = self.step()
+            if events is None:
+                return
+            yield events
+    
+    # Get an instruction that is in the window
+    def get_instruction(self, k):
+        return self.window[k][0]
+    
+    # Fill the window in program order
+    def dispatch(self):
+        while (not self.exhausted and (self.window_size is None or len(self.window) < self.window_size)
+               and (self.issue_window is None or self.num_waiting < self.issue_window)):
+            
+            if self.stalled_instruction is not None:
+                instruction = self.stalled_instruction
+                self.stalled_instruction = None
+            else:
+                try:
+                    instruction = next(self.source)
+                except StopIteration:
+                    self.exhausted = True
+                    break
+            
+            # Get the destination and source registers, renamed if required
+            if self.renamer is None:
+                destination_register = instruction.destination
+                source_register_1 = instruction.source_1
+                source_register_2 = instruction.source_2
+            elif self.renamer.can_rename():
+                destination_register, source_register_1, source_register_2 = self.renamer.rename(instruction)
+            else:
+                
+                # Stall until a physical register is reclaimed
+                self.stalled_instruction = instruction
+                break
+            
+            k = self.num_fetched
+            self.num_fetched += 1
+            
+            # RAW, WAW and WAR dependencies with the instructions in the window
+            predecessors = set()
+            if source_register_1 in self.last_writer:
+                predecessors.add(self.last_writer[source_register_1])
+            if source_register_2 in self.last_writer:
+                predecessors.add(self.last_writer[source_register_2])
+            if destination_register in self.last_writer:
+                predecessors.add(self.last_writer[destination_register])
+            predecessors.update(self.readers.get(destination_register, ()))
+            
+            for predecessor in predecessors:
+                self.window[predecessor][6].append(k)
+            
+            # Save the kinds of the dependencies to classify the stalls
+            dependency_counts = None
+            if self.dependency_kinds is not None:
+                dependency_counts = self.count_dependencies(k, predecessors, destination_register, source_register_1, source_register_2)
+            
+            # Update the last readers and writer
+            self.readers.setdefault(source_register_1, set()).add(k)
+            self.readers.setdefault(source_register_2, set()).add(k)
+            self.last_writer[destination_register] = k
+            self.readers[destination_register] = set()
+            
+            # Get the unit class and latency from the unit pools
+            latency = instruction.latency
+            unit_class = None
+            if self.unit_pools is not None:
+                unit_class = OPCODE_UNITS[instruction.opcode]
+                pool = self.unit_pools.get(unit_class)
+                if pool is not None and pool.latency is not None:
+                    latency = pool.latency
+            
+            self.window[k] = [instruction, destination_register, source_register_1, source_register_2, latency, len(predecessors), [], False, False,
+                              dependency_counts, unit_class]
+            self.num_waiting += 1
+            if self.out_of_order_issue and not predecessors:
+                heapq.heappush(self.ready if unit_class is None else self.class_ready[unit_class], k)
+    
+    # Find the kinds of the dependencies of a new instruction with the instructions in the window
+    # Returns the number of RAW, WAR and WAW dependencies it waits for
+    def count_dependencies(self, k, predecessors, destination_register, source_register_1, source_register_2):
+        kinds = dict.fromkeys(predecessors, 0)
+        if source_register_1 in self.last_writer:
+            kinds[self.last_writer[source_register_1]] |= DEPENDENCY_RAW
+        if source_register_2 in self.last_writer:
+            kinds[self.last_writer[source_register_2]] |= DEPENDENCY_RAW
+        if destination_register in self.last_writer:
+            kinds[self.last_writer[destination_register]] |= DEPENDENCY_WAW
+        for reader in self.readers.get(destination_register, ()):
+            kinds[reader] |= DEPENDENCY_WAR
+        
+        dependency_counts = [0, 0, 0]
+        for predecessor, kind in kinds.items():
+            self.dependency_kinds[predecessor, k] = kind
+            dependency_counts[0] += kind & DEPENDENCY_RAW != 0
+            dependency_counts[1] += kind & DEPENDENCY_WAR != 0
+            dependency_counts[2] += kind & DEPENDENCY_WAW != 0
+        return dependency_counts
+    
+    # Issue up to num_units instructions, returns them
+    def issue(self, cycle):
+        if self.unit_pools is not None:
+            return self.issue_to_pools(cycle)
+        
+        window = self.window
+        issued = []
+        
+        for i in range(self.num_units):
+            
+            # Find the next instruction that can be issued
+            k = -1
+            if self.out_of_order_issue:
+                if self.ready:
+                    k = heapq.heappop(self.ready)
+            elif self.next_instruction < self.num_fetched and window[self.next_instruction][5] == 0:
+                k = self.next_instruction
+                self.next_instruction += 1
+            
+            # Nothing else can be issued this cycle
+            if k < 0:
+                break
+            
+            # Schedule the completion
+            heapq.heappush(self.in_flight, (cycle + window[k][4], self.issue_order, k))
+            self.issue_order += 1
+            window[k][8] = True
+            issued.append(k)
+        
+        self.num_waiting -= len(issued)
+        return issued
+    
+    # Issue up to num_units instructions to the free units of their pools, returns them
+    def issue_to_pools(self, cycle):
+        window = self.window
+        issued = []
+        
+        # Free the non-pipelined units whose operation completed and count the free units of each class
+        free_units = {}
+        for unit_class in UNIT_CLASSES:
+            pool = self.unit_pools.get(unit_class)
+            if pool is None:
+                free_units[unit_class] = self.num_units
+                continue
+            busy_units = self.busy_units[unit_class]
+            while busy_units and busy_units[0] <= cycle:
+                heapq.heappop(busy_units)
+            free_units[unit_class] = pool.count - len(busy_units)
+        
+        while len(issued) < self.num_units:
+            
+            # Find the oldest ready instruction with a free unit, or the next instruction for in-order issue
+            k = -1
+            if self.out_of_order_issue:
+                for unit_class, ready in self.class_ready.items():
+                    if ready and free_units[unit_class] > 0 and (k < 0 or ready[0] < k):
+                        k = ready[0]
+                if k >= 0:
+                    heapq.heappop(self.class_ready[window[k][10]])
+            elif (self.next_instruction < self.num_fetched and window[self.next_instruction][5] == 0
+                  and free_units[window[self.next_instruction][10]] > 0):
+                k = self.next_instruction
+                self.next_instruction += 1
+            
+            # Nothing else can be issued this cycle
+            if k < 0:
+                break
+            
+            # Take a unit of its pool, a non-pipelined unit stays busy until the operation completes
+            unit_class = window[k][10]
+            latency = window[k][4]
+            pool = self.unit_pools.get(unit_class)
+            free_units[unit_class] -= 1
+            self.unit_issued[unit_class] += 1
+            if pool is not None and not pool.pipelined:
+                heapq.heappush(self.busy_units[unit_class], cycle + latency)
+                self.unit_busy_cycles[unit_class] += latency
+            else:
+                self.unit_busy_cycles[unit_class] += 1
+            
+            # Schedule the completion
+            heapq.heappush(self.in_flight, (cycle + latency, self.issue_order, k))
+            self.issue_order += 1
+            window[k][8] = True
+            issued.append(k)
+        
+        # Count the ready instructions left without a unit, the next cycle has to be processed for them
+        self.pool_blocked = False
+        if len(issued) < self.num_units:
+            if self.out_of_order_issue:
+                for unit_class, ready in self.class_ready.items():
+                    if ready:
+                        self.unit_blocked[unit_class] += len(ready)
+                        self.pool_blocked = True
+            elif self.next_instruction < self.num_fetched and window[self.next_instruction][5] == 0:
+                self.unit_blocked[window[self.next_instruction][10]] += 1
+                self.pool_blocked = True
+        
+        self.num_waiting -= len(issued)
+        return issued
+    
+    # Usage of each unit pool after cycles cycles: number of units, instructions issued, share of the unit cycles
+    # the units were busy, and ready instructions left without a unit added up over the cycles
+    def unit_usage(self, cycles):
+        usage = {}
+        for unit_class, pool in self.unit_pools.items():
+            usage[unit_class] = {'count': pool.count, 'issued': self.unit_issued[unit_class],
+                                 'utilization': self.unit_busy_cycles[unit_class] / (pool.count * cycles) if cycles > 0 else 0.0,
+                                 'blocked': self.unit_blocked[unit_class]}
+        return usage
+    
+    # Retire the instructions that complete this cycle, returns them
+    def retire(self, cycle):
+        window = self.window
+        
+        # Collect the instructions that complete this cycle
+        retired = []
+        while self.in_flight and self.in_flight[0][0] <= cycle:
+            k = heapq.heappop(self.in_flight)[2]
+            window[k][7] = True
+            if self.out_of_order_retirement:
+                retired.append(k)
+        
+        # Only allow in order retirement if required
+        if not self.out_of_order_retirement:
+            while self.head < self.num_fetched and window[self.head][7]:
+                retired.append(self.head)
+                self.head += 1
+        
+        # Retire the instructions, release the instructions that depend on them and drop them from the window
+        for k in retired:
+            entry = window.pop(k)
+            for successor in entry[6]:
+                window[successor][5] -= 1
+                if window[successor][5] == 0 and self.out_of_order_issue:
+                    unit_class = window[successor][10]
+                    heapq.heappush(self.ready if unit_class is None else self.class_ready[unit_class], successor)
+            if self.dependency_kinds is not None:
+                self.release_dependencies(k, entry[6])
+            if self.last_writer.get(entry[1]) == k:
+                del self.last_writer[entry[1]]
+            self.readers[entry[2]].discard(k)
+            self.readers[entry[3]].discard(k)
+            if self.renamer is not None:
+                self.renamer.retire(entry[1], entry[2], entry[3])
+        self.num_retired += len(retired)
+        
+        return retired
+    
+    # Update the number of dependencies of each kind the successors of a retired instruction wait for
+    def release_dependencies(self, k, successors):
+        for successor in successors:
+            kind = self.dependency_kinds.pop((k, successor))
+            dependency_counts = self.window[successor][9]
+            dependency_counts[0] -= kind & DEPENDENCY_RAW != 0
+            dependency_counts[1] -= kind & DEPENDENCY_WAR != 0
+            dependency_counts[2] -= kind & DEPENDENCY_WAW != 0
+    
+    # Find the reason why the oldest instruction not issued yet could not be issued this cycle
+    def stall_reason(self):
+        window = self.window
+        
+        # Skip the instructions already issued
+        k = self.oldest_not_issued
+        while k < self.num_fetched and (k not in window or window[k][8]):
+            k += 1
+        self.oldest_not_issued = k
+        
+        # Nothing to issue in the window
+        if k == self.num_fetched:
+            if self.stalled_instruction is not None:
+                return STALL_RENAME
+            if self.exhausted:
+                return STALL_DRAIN
+            return STALL_WINDOW_FULL
+        
+        # True dependencies first, then output and anti-dependencies
+        raw, war, waw = window[k][9]
+        if raw:
+            return STALL_RAW
+        if waw:
+            return STALL_WAW
+        if war:
+            return STALL_WAR
+        
+        # Ready but not issued while slots were left: its pool had no free unit
+        return STALL_UNIT_BUSY
+    
+    # Count the ready instructions left without a functional unit
+    def structural_stalls(self):
+        if self.out_of_order_issue:
+            if self.class_ready is not None:
+                return sum(len(ready) for ready in self.class_ready.values())
+            return len(self.ready)
+        return int(self.next_instruction < self.num_fetched and self.window[self.next_instruction][5] == 0)
+    
+    # Process the next cycle where something can happen
+    # Returns the cycle (starting at 1) with the instructions issued and retired, or None when done
+    def step(self):
+        if self.done:
+            return None
+        
+        cycle = self.cycle
+        
+        self.dispatch()
+        
+        # Check if all the instructions have been retired, an empty trace still takes one (empty) cycle
+        # as in the cycle-by-cycle schedulers
+        if self.exhausted and not self.window and self.stalled_instruction is None and cycle > 0:
+            self.done = True
+            return None
+        
+        # Issuing from a full issue window lets more instructions in next cycle
+        window_blocked = self.issue_window is not None and self.num_waiting == self.issue_window
+        issued = self.issue(cycle)
+        
+        # Classify the lost issue slots before anything retires
+        if self.stalls is not None:
+            lost_slots = self.num_units - len(issued)
+            reason = self.stall_reason() if lost_slots else STALL_STRUCTURAL
+            structural = 0 if lost_slots else self.structural_stalls()
+        
+        retired = self.retire(cycle)
+        
+        # Move to the next cycle where something can happen: the next cycle if the issue slots were
+        # full, instructions were retired, the issue window has room again or ready instructions wait for a unit,
+        # otherwise the next completion
+        if len(issued) == self.num_units or retired or not self.in_flight or (window_blocked and issued) or self.pool_blocked:
+            self.cycle = cycle + 1
+        else:
+            self.cycle = self.in_flight[0][0]
+        
+        # The idle cycles skipped lose all their slots for the same reason, since nothing changes until then
+        if self.stalls is not None:
+            lost_slots += self.num_units * (self.cycle - cycle - 1)
+            if lost_slots:
+                self.stalls[reason] += lost_slots
+            self.stalls[STALL_STRUCTURAL] += structural
+            if self.observer is not None:
+                if lost_slots:
+                    self.observer.on_stall(cycle + 1, reason, lost_slots)
+                if structural:
+                    self.observer.on_stall(cycle + 1, STALL_STRUCTURAL, structural)
+        
+        if self.observer is not None:
+            for k in issued:
+                self.observer.on_issue(cycle + 1, k)
+            for k in retired:
+                self.observer.on_retire(cycle + 1, k)
+            self.observer.on_cycle(cycle + 1, issued, retired)
+        
+        return cycle + 1, issued, retired
+
+# Function to save a checkpoint of a run: the scheduler state and the events (or totals) recorded so far
+# The file is replaced atomically, so a crash while saving keeps the previous checkpoint. settings identifies the
+# trace and the configuration of the run, so that load_checkpoint can refuse to resume it on another one.
+def save_checkpoint(path, scheduler, recorder, settings=None):
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        pickle.dump({'version': ENGINE_VERSION, 'settings': settings, 'scheduler': scheduler, 'recorder': recorder}, file,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, path)
+
+# Function to load a checkpoint and resume it on the instructions of the run, returns the scheduler and the recorder
+# The same checkpoint can be resumed any number of times, with other numbers of functional units or window sizes.
+# With settings, raises ValueError if the checkpoint was saved with other settings (see save_checkpoint).
+def load_checkpoint(path, instructions, num_units=None, window_size=None, observer=None, settings=None):
+    with open(path, 'rb') as file:
+        checkpoint = pickle.load(file)
+    
+    if checkpoint['version'] != ENGINE_VERSION:
+        raise ValueError(f"The checkpoint was saved by another version of the schedulers ({checkpoint['version']})")
+    if settings is not None and checkpoint.get('settings') != settings:
+        raise ValueError(f"The checkpoint {path!r} was saved by a run on another trace or with other settings")
+    
+    scheduler = checkpoint['scheduler']
+    scheduler.resume(instructions, num_units, window_size, observer)
+    
+    # The utilization is measured against the new number of functional units
+    recorder = checkpoint['recorder']
+    if isinstance(recorder, ScheduleSummary):
+        recorder.num_units = scheduler.num_units
+    return scheduler, recorder
+
+# Function to run an event-driven scheduler and save the issue and retire events of the instructions
+# trace continues a restored run. With checkpoint_path, a checkpoint is saved every checkpoint_interval cycles.
+def record_schedule(scheduler, num_instructions, trace=None, checkpoint_path=None, checkpoint_interval=None, checkpoint_settings=None):
+    if trace is None:
+        trace = ScheduleTrace(2 * num_instructions)
+    next_checkpoint = scheduler.cycle + checkpoint_interval if checkpoint_path is not None else None
+    
+    for cycle, issued, retired in scheduler:
+        for k in issued:
+            trace.record(cycle, k, EVENT_ISSUE)
+        for k in retired:
+            trace.record(cycle, k, EVENT_RETIRE)
+        
+        if next_checkpoint is not None and scheduler.cycle >= next_checkpoint:
+            save_checkpoint(checkpoint_path, scheduler, trace, checkpoint_settings)
+            next_checkpoint = scheduler.cycle + checkpoint_interval
+    
+    # The cycle of an empty trace has no events
+    if scheduler.cycle > trace.num_cycles:
+        trace.num_cycles = scheduler.cycle
+    
+    return trace
+
+# Function to run an event-driven scheduler keeping only the totals of the run
+# summary continues a restored run. With checkpoint_path, a checkpoint is saved every checkpoint_interval cycles.
+def summarize_schedule(scheduler, summary=None, checkpoint_path=None, checkpoint_interval=None, checkpoint_settings=None):
+    if summary is None:
+        summary = ScheduleSummary(scheduler.num_units)
+    next_checkpoint = scheduler.cycle + checkpoint_interval if checkpoint_path is not None else None
+    
+    for cycle, issued, retired in scheduler:
+        summary.record_cycle(cycle, len(issued), len(retired))
+        
+        if next_checkpoint is not None and scheduler.cycle >= next_checkpoint:
+            save_checkpoint(checkpoint_path, scheduler, summary, checkpoint_settings)
+            next_checkpoint = scheduler.cycle + checkpoint_interval
+    
+    return summary
+
+# Kinds of rows written by a schedule sink: one row per issue or retire event, or one row per cycle
+SINK_EVENTS = 'events'
+SINK_CYCLES = 'cycles'
+SINK_ROWS = (SINK_EVENTS, SINK_CYCLES)
+
+# Schedule sink: observer that writes the schedule to a file while it is produced
+# Event rows are (cycle, instruction number, 'issue' or 'retire'). Cycle rows are (cycle, instructions issued,
+# instructions retired), with the instruction numbers separated by spaces and empty rows for the idle cycles.
+# The rows are buffered and written chunk_size at a time, so memory does not depend on the length of the run.
+# Subclasses open the file in open(), write a chunk of rows in write_chunk() and close the file in close_file().
+# Call close(), or use the sink as a context manager, to write the last rows.
+class ScheduleSink(SchedulerObserver):
+    
+    def __init__(self, path, rows=SINK_EVENTS, chunk_size=65536):
+        if rows not in SINK_ROWS:
+            raise ValueError(f"Invalid rows {rows!r}, expected one of {', '.join(SINK_ROWS)}")
+        if chunk_size < 1:
+            raise ValueError("The chunk size must be at least 1 row")
+        
+        self.path = path
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self.columns = ('cycle', 'instruction', 'event') if rows == SINK_EVENTS else ('cycle', 'issued', 'retired')
+        self.buffer = []
+        self.num_rows = 0
+        self.last_cycle = 0
+        self.closed = False
+        self.open()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exception):
+        self.close()
+    
+    def on_issue(self, cycle, k):
+        if self.rows == SINK_EVENTS:
+            self.add_row((cycle, k + 1, 'issue'))
+    
+    def on_retire(self, cycle, k):
+        if self.rows == SINK_EVENTS:
+            self.add_row((cycle, k + 1, 'retire'))
+    
+    def on_cycle(self, cycle, issued, retired):
+        if self.rows == SINK_CYCLES:
+            for idle_cycle in range(self.last_cycle + 1, cycle):
+                self.add_row((idle_cycle, '', ''))
+            self.add_row((cycle, ' '.join(str(k + 1) for k in issued), ' '.join(str(k + 1) for k in retired)))
+            self.last_cycle = cycle
+    
+    # Add a row, writing the buffered rows once there is a full chunk
+    def add_row(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+    
+    # Write the buffered rows
+    def flush(self):
+        if self.buffer:
+            self.write_chunk(self.buffer)
+            self.num_rows += len(self.buffer)
+            self.buffer = []
+    
+    def close(self):
+        if not self.closed:
+            self.flush()
+            self.close_file()
+            self.closed = True
+    
+    def open(self):
+        raise NotImplementedError
+    
+    def write_chunk(self, rows):
+        raise NotImplementedError
+    
+    def close_file(self):
+        pass
+
+# Sink that writes the schedule as CSV, with a header row
+class CSVSink(ScheduleSink):
+    
+    def open(self):
+        self.file = open(self.path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.columns)
+    
+    def write_chunk(self, rows):
+        self.writer.writerows(rows)
+    
+    def close_file(self):
+        self.file.close()
+
+# Sink that writes the schedule as JSON Lines, one object per row
+class JSONLinesSink(ScheduleSink):
+    
+    def open(self):
+        self.file = open(self.path, 'w')
+    
+    def write_chunk(self, rows):
+        self.file.write(''.join(json.dumps(dict(zip(self.columns, row))) + '\n' for row in rows))
+    
+    def close_file(self):
+        self.file.close()
+
+# Sink that writes the schedule as a Parquet file, one row group per chunk (requires pyarrow)
+class ParquetSink(ScheduleSink):
+    
+    def open(self):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError(f"Writing {self.path!r} requires pyarrow") from None
+        
+        self.schema = pa.schema([(column, pa.int64() if column in ('cycle', 'instruction') else pa.string()) for column in self.columns])
+        self.writer = self.new_writer()
+    
+    def new_writer(self):
+        import pyarrow.parquet as pq
+        
+        return pq.ParquetWriter(self.path, self.schema)
+    
+    def write_chunk(self, rows):
+        import pyarrow as pa
+        
+        arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), self.schema)]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+    
+    def close_file(self):
+        self.writer.close()
+
+# Sink that writes the schedule as an Arrow IPC file, one record batch per chunk (requires pyarrow)
+class ArrowSink(ParquetSink):
+    
+    def new_writer(self):
+        import pyarrow as pa
+        
+        return pa.ipc.new_file(self.path, self.schema)
+
+# Sink class of each file extension
+SINK_FORMATS = {'.csv': CSVSink, '.jsonl': JSONLinesSink, '.parquet': ParquetSink, '.arrow': ArrowSink}
+
+# Function to open a schedule sink, the format is given by the extension of the file
+def open_sink(path, rows=SINK_EVENTS, chunk_size=65536):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINK_FORMATS:
+        raise ValueError(f"Unknown output format {extension!r}, expected one of {', '.join(SINK_FORMATS)}")
+    return SINK_FORMATS[extension](path, rows, chunk_size)
+
+# Function for scheduling instructions with the event-driven engine
+# rob_size limits the number of instructions that have not retired yet, by default there is no limit.
+# physical_registers enables register renaming with that many physical registers (and architectural_registers
+# architectural registers, by default NUM_REGISTERS or the registers used by the trace if it uses more).
+# summary only keeps the totals of the run and returns a ScheduleSummary.
+# issue_window limits the instructions waiting to be issued in the out-of-order modes, by default there is no limit.
+def event_driven_execution(instructions, num_units, mode, rob_size=None, as_trace=False, physical_registers=None, summary=False,
+                           issue_window=None, architectural_registers=None):
+    
+    scheduler = EventDrivenScheduler(instructions, num_units, mode, rob_size, physical_registers, issue_window=issue_window,
+                                     architectural_registers=architectural_registers)
+    if summary:
+        return summarize_schedule(scheduler)
+    trace = record_schedule(scheduler, len(instructions))
+    
+    # Return the schedule trace or the dataframe, idle cycles get empty rows
+    if as_trace:
+        return trace
+    return trace.to_dataframe(instructions)
+
+# Function for scheduling a stream of instructions with the event-driven engine
+# Yields the cycle with the instructions issued and retired strings of every cycle where something
+# happened, keeping at most window_size instructions in memory.
+def streaming_execution(instructions, num_units, mode, window_size=64):
+    
+    scheduler = EventDrivenScheduler(instructions, num_units, mode, window_size)
+    
+    for cycle, issued, retired in scheduler:
+        instructions_issued_str = ''.join(format_instruction(scheduler.get_instruction(k), k+1) for k in issued)
+        instructions_retired_str = ''.join(f"{k+1}. " for k in retired)
+        yield cycle, instructions_issued_str, instructions_retired_str
+
+# Function to print the schedule of a stream of instructions as it is produced, one row per cycle
+def print_streaming_execution(instructions, num_units, mode, window_size=64):
+    
+    print(f"{'Cycle':>8}  {'Instructions Issued':<60}  Retired")
+    last_cycle = 0
+    
+    for cycle, instructions_issued_str, instructions_retired_str in streaming_execution(instructions, num_units, mode, window_size):
+        
+        # Print the idle cycles
+        for idle_cycle in range(last_cycle + 1, cycle):
+            print(f"{idle_cycle:>8}")
+        
+        print(f"{cycle:>8}  {instructions_issued_str:<60}  {instructions_retired_str}")
+        last_cycle = cycle
+
+# Critical path analysis of a trace: number of instructions, cycles of the longest chain of true (RAW)
+# dependencies and smallest latency of its instructions
+TraceAnalysis = namedtuple('TraceAnalysis', ['num_instructions', 'critical_path', 'min_latency'])
+
+# Function to analyze the true dependencies of a trace in one pass, without building the graph or simulating
+# An instruction can issue the cycle after all the instructions it reads from retire, and retires latency cycles
+# after it issues, so each instruction of a chain adds its latency plus one cycle. WAR and WAW dependencies are
+# left out: they are removed by register renaming, so the result is a bound for every processor mode.
+def analyze_trace(instructions):
+    
+    # Cycles until the last instruction that wrote each register has retired
+    ready = {}
+    critical_path = 0
+    min_latency = None
+    num_instructions = 0
+    
+    for instruction in instructions:
+        finish = max(ready.get(instruction.source_1, 0), ready.get(instruction.source_2, 0)) + instruction.latency + 1
+        ready[instruction.destination] = finish
+        if finish > critical_path:
+            critical_path = finish
+        if min_latency is None or instruction.latency < min_latency:
+            min_latency = instruction.latency
+        num_instructions += 1
+    
+    return TraceAnalysis(num_instructions, critical_path, min_latency or 0)
+
+# Lower bound of the cycles of a run, with the bound from the dependencies and from the functional units
+CycleBound = namedtuple('CycleBound', ['num_units', 'critical_path', 'resource_bound', 'cycles', 'ipc'])
+
+# Function to get the lower bound of the cycles of any run of an analyzed trace with num_units functional units
+# At most num_units instructions issue per cycle, and the last ones still take the smallest latency to retire.
+# Computing it takes constant time, so any number of configurations can be ranked from one analysis.
+def cycle_lower_bound(analysis, num_units):
+    if num_units < 1:
+        raise ValueError("The number of functional units must be at least 1")
+    
+    resource_bound = 0
+    if analysis.num_instructions > 0:
+        resource_bound = -(-analysis.num_instructions // num_units) + analysis.min_latency
+    cycles = max(analysis.critical_path, resource_bound)
+    
+    return CycleBound(num_units, analysis.critical_path, resource_bound, cycles, analysis.num_instructions / cycles if cycles > 0 else 0.0)
+
+# Estimate of a sampled simulation, with the bounds of its confidence interval
+SampledSummary = namedtuple('SampledSummary', ['mode', 'num_units', 'num_instructions', 'cycles', 'ipc', 'cycles_low', 'cycles_high',
+                                               'ipc_low', 'ipc_high', 'confidence', 'num_samples', 'sampled_instructions'])
+
+# Function to measure the cycles per instruction of a sample with the event-driven engine
+# The first warmup instructions fill the window and the instructions after the sample keep it full while
+# the sample drains, only the cycles between the retirement of the warmup and of the sample are counted.
+def measure_sample(instructions, num_units, mode, rob_size, warmup, sample_size):
+    scheduler = EventDrivenScheduler(instructions, num_units, mode, rob_size)
+    start_cycle = 0 if warmup == 0 else None
+    num_retired = 0
+    
+    for cycle, issued, retired in scheduler:
+        num_retired += len(retired)
+        if start_cycle is None and num_retired >= warmup:
+            start_cycle = cycle
+        if num_retired >= warmup + sample_size:
+            return (cycle - start_cycle) / sample_size
+    
+    return None
+
+# Function to estimate the cycles and IPC of a trace by simulating periodic samples in detail
+# Every sample_period instructions, warmup instructions warm up the window, the next sample_size are
+# measured and warmup more keep it busy; the instructions in between are only read (fast-forward).
+# The cycles per instruction of the samples are extrapolated to the whole trace, with a confidence
+# interval from their spread. Traces too short for two samples are simulated in full, so the instructions
+# must then be iterable again (a list, a parsed trace or a TraceFile, not a one-shot iterator).
+def sampled_execution(instructions, num_units, mode, rob_size=None, sample_period=100000, sample_size=1000, warmup=1000, confidence=0.95):
+    
+    if sample_size < 1 or warmup < 0:
+        raise ValueError("The sample size must be at least 1 and the warmup can't be negative")
+    if sample_period < 2 * warmup + sample_size:
+        raise ValueError("The sample period must fit the warmup, the sample and the instructions after it")
+    if not 0 < confidence < 1:
+        raise ValueError("The confidence must be between 0 and 1")
+    
+    source = iter(instructions)
+    samples = []
+    num_instructions = 0
+    first_chunk = None
+    
+    while True:
+        
+        # Simulate the start of the period in detail and fast-forward through the rest
+        chunk = list(islice(source, 2 * warmup + sample_size))
+        if first_chunk is None:
+            first_chunk = chunk
+        skipped = sum(1 for instruction in islice(source, sample_period - len(chunk)))
+        num_instructions += len(chunk) + skipped
+        
+        cycles_per_instruction = measure_sample(chunk, num_units, mode, rob_size, warmup, sample_size)
+        if cycles_per_instruction is not None:
+            samples.append(cycles_per_instruction)
+        
+        if len(chunk) + skipped < sample_period:
+            break
+    
+    # Simulate short traces in full, the first chunk already holds the whole trace if it is short enough
+    if len(samples) < 2:
+        if num_instructions > len(first_chunk):
+            if iter(instructions) is instructions:
+                raise ValueError("The trace is too short for two samples and can't be read again to simulate it in full")
+            first_chunk = instructions
+        summary = summarize_schedule(EventDrivenScheduler(first_chunk, num_units, mode, rob_size))
+        return SampledSummary(mode, num_units, num_instructions, summary.num_cycles, summary.ipc, summary.num_cycles,
+                              summary.num_cycles, summary.ipc, summary.ipc, confidence, 0, num_instructions)
+    
+    # Extrapolate the mean cycles per instruction, with a normal confidence interval
+    mean = statistics.fmean(samples)
+    half_width = statistics.NormalDist().inv_cdf((1 + confidence) / 2) * statistics.stdev(samples) / len(samples) ** 0.5
+    low = max(mean - half_width, 1e-9)
+    high = mean + half_width
+    
+    return SampledSummary(mode, num_units, num_instructions, mean * num_instructions, 1 / mean,
+                          low * num_instructions, high * num_instructions, 1 / high, 1 / low,
+                          confidence, len(samples), len(samples) * sample_size)
+
+# Result of a simulation
+class SimulationResult:
+    
+    def __init__(self, instructions, mode, num_units, trace, stalls=None, phase_times=None, unit_usage=None):
+        self.instructions = instructions
+        self.mode = mode
+        self.num_units = num_units
+        self.trace = trace
+        self.stalls = stalls
+        self.phase_times = phase_times
+        self.unit_usage = unit_usage
+        self.num_instructions = len(instructions)
+        self.cycles = trace.num_cycles
+        self.ipc = self.num_instructions / self.cycles if self.cycles > 0 else 0.0
+    
+    def __repr__(self):
+        return f"SimulationResult(mode={self.mode!r}, num_units={self.num_units}, instructions={self.num_instructions}, cycles={self.cycles}, ipc={self.ipc:.3f})"
+    
+    # Build the table with a row for every cycle
+    def to_dataframe(self):
+        return self.trace.to_dataframe(self.instructions)
+    
+    # Build the instructions issued and retired strings of every cycle
+    def to_strings(self):
+        return self.trace.to_strings(self.instructions)
+
+# Result of a batch simulation: issue and retire cycle of every instruction of every trace
+# issue_cycles and retire_cycles are padded (number of traces x longest trace) arrays.
+class BatchResult:
+    
+    def __init__(self, traces, mode, num_units, lengths, issue_cycles, retire_cycles, num_cycles):
+        self.traces = traces
+        self.mode = mode
+        self.num_units = num_units
+        self.lengths = lengths
+        self.issue_cycles = issue_cycles
+        self.retire_cycles = retire_cycles
+        self.num_cycles = num_cycles
+    
+    def __len__(self):
+        return len(self.traces)
+    
+    # Build the schedule trace of one of the traces, with the events of each cycle in the scalar engines order
+    def to_trace(self, index):
+        import numpy as np
+        
+        num_instructions = int(self.lengths[index])
+        issue_cycles = self.issue_cycles[index, :num_instructions]
+        retire_cycles = self.retire_cycles[index, :num_instructions]
+        program_order = np.arange(num_instructions)
+        
+        # Instructions issue in program order, and retire in issue order when out-of-order retirement is allowed
+        issue_order = np.lexsort((program_order, issue_cycles))
+        if self.mode == MODE_OOO_RETIREMENT:
+            retire_order = np.lexsort((program_order, issue_cycles, retire_cycles))
+        else:
+            retire_order = np.lexsort((program_order, retire_cycles))
+        
+        trace = ScheduleTrace(2 * num_instructions)
+        for k in issue_order.tolist():
+            trace.record(int(issue_cycles[k]), k, EVENT_ISSUE)
+        for k in retire_order.tolist():
+            trace.record(int(retire_cycles[k]), k, EVENT_RETIRE)
+        trace.num_cycles = int(self.num_cycles[index])
+        return trace
+    
+    # Build the summary of one of the traces from its issue and retire cycles
+    def summary(self, index):
+        num_instructions = int(self.lengths[index])
+        summary = ScheduleSummary(self.num_units)
+        summary.num_cycles = int(self.num_cycles[index])
+        summary.num_issued = summary.num_retired = num_instructions
+        summary.issue_cycles_total = int(self.issue_cycles[index, :num_instructions].sum())
+        summary.retire_cycles_total = int(self.retire_cycles[index, :num_instructions].sum())
+        return summary
+    
+    # Build the simulation result of every trace
+    def results(self):
+        return [SimulationResult(self.traces[i], self.mode, self.num_units, self.to_trace(i)) for i in range(len(self))]
+
+# Longest trace of a bucket of the batch engine, as a multiple of the shortest one
+BATCH_BUCKET_RATIO = 2
+
+# Function for scheduling many traces at once with the same processor settings (requires numpy)
+# The traces are run in buckets of similar lengths (see batch_schedule), and the results match the
+# cycle-by-cycle schedulers exactly. The engine pays a fixed cost per simulated cycle, shared by the traces
+# of a bucket, so it only helps with many short traces of similar lengths: a single trace, or a few long
+# ones, run much faster on the other engines.
+# rob_size limits the reorder buffer for out-of-order issue, in-order retirement, as in the cycle-by-cycle engine.
+def batch_execution(traces, num_units, mode, rob_size=None):
+    import numpy as np
+    
+    if mode not in MODES:
+        raise ValueError(f"Invalid mode {mode!r}, expected one of {', '.join(MODES)}")
+    if rob_size is not None and mode != MODE_OOO_IN_ORDER_RETIREMENT:
+        raise ValueError("The batch engine only supports a reorder buffer size for out-of-order issue, in-order retirement")
+    
+    traces = [as_parsed_trace(trace) for trace in traces]
+    num_traces = len(traces)
+    lengths = np.array([len(trace) for trace in traces], dtype=np.int64)
+    width = int(lengths.max(initial=0)) + 1
+    
+    # Results (cycle 0 means not issued or retired yet)
+    issue_out = np.zeros((num_traces, width), dtype=np.int64)
+    retire_out = np.zeros((num_traces, width), dtype=np.int64)
+    num_cycles = np.zeros(num_traces, dtype=np.int64)
+    
+    # Split the traces sorted by length so that the longest trace of a bucket is at most BATCH_BUCKET_RATIO
+    # times as long as the shortest one, a long trace does not pad the arrays of many short ones
+    order = np.argsort(lengths, kind='stable')
+    start = 0
+    while start < num_traces:
+        end = start + 1
+        while end < num_traces and lengths[order[end]] <= BATCH_BUCKET_RATIO * max(int(lengths[order[start]]), 1):
+            end += 1
+        
+        bucket = order[start:end]
+        issue_cycles, retire_cycles, bucket_cycles = batch_schedule([traces[i] for i in bucket], num_units, mode, rob_size)
+        issue_out[bucket, :issue_cycles.shape[1]] = issue_cycles
+        retire_out[bucket, :retire_cycles.shape[1]] = retire_cycles
+        num_cycles[bucket] = bucket_cycles
+        start = end
+    
+    return BatchResult(traces, mode, num_units, lengths, issue_out, retire_out, num_cycles)
+
+# Function to schedule a bucket of parsed traces together, returns the issue and retire cycles of every
+# instruction as padded (number of traces x longest trace + 1) arrays and the number of cycles of every trace
+# The traces are advanced together one cycle per step. Each step only looks at a window of every trace, from
+# its oldest instruction not retired to far enough to hold the instructions in flight and the ones that can
+# issue, so a step costs the number of traces times the widest window instead of the length of the traces.
+# Retiring an instruction releases its successors, stored trace by trace in one flat array, and finished
+# traces are dropped from the arrays.
+def batch_schedule(traces, num_units, mode, rob_size=None):
+    import numpy as np
+    
+    num_traces = len(traces)
+    lengths = np.array([len(trace) for trace in traces], dtype=np.int64)
+    
+    # One extra column that is never issued, the windows are clipped to it past the end of a trace
+    width = int(lengths.max(initial=0)) + 1
+    
+    # Latencies and number of instructions each one waits for, padded to the longest trace
+    latencies = np.zeros((num_traces, width), dtype=np.int64)
+    num_predecessors = np.zeros((num_traces, width), dtype=np.int64)
+    
+    # Successors of every instruction, successor_targets[successor_starts[i, k]:successor_ends[i, k]]
+    successor_starts = np.zeros((num_traces, width), dtype=np.int64)
+    successor_ends = np.zeros((num_traces, width), dtype=np.int64)
+    successor_targets = []
+    
+    for i, trace in enumerate(traces):
+        num_instructions = len(trace)
+        successors, predecessors = trace.dependency_graph
+        latencies[i, :num_instructions] = [instruction.latency for instruction in trace.instructions]
+        num_predecessors[i, :num_instructions] = predecessors
+        
+        ends = len(successor_targets) + np.cumsum([len(k) for k in successors], dtype=np.int64)
+        successor_ends[i, :num_instructions] = ends
+        successor_starts[i, :num_instructions] = ends - [len(k) for k in successors]
+        for successors_k in successors:
+            successor_targets.extend(successors_k)
+    
+    successor_targets = np.array(successor_targets, dtype=np.int64)
+    
+    # Results (cycle 0 means not issued or retired yet)
+    issue_out = np.zeros((num_traces, width), dtype=np.int64)
+    retire_out = np.zeros((num_traces, width), dtype=np.int64)
+    num_cycles = np.zeros(num_traces, dtype=np.int64)
+    
+    # State of the traces still running, rows maps them to their index in traces and row_starts to the start of
+    # their row in the flattened arrays. head is the oldest instruction not retired, issued_end follows the
+    # youngest instruction issued and num_ready counts the instructions ready but not issued
+    rows = np.arange(num_traces)
+    row_starts = rows[:, None] * width
+    issue_cycles = np.zeros((num_traces, width), dtype=np.int64)
+    retire_cycles = np.zeros((num_traces, width), dtype=np.int64)
+    head = np.zeros(num_traces, dtype=np.int64)
+    num_issued = np.zeros(num_traces, dtype=np.int64)
+    issued_end = np.zeros(num_traces, dtype=np.int64)
+    num_retired = np.zeros(num_traces, dtype=np.int64)
+    num_ready = ((num_predecessors == 0) & (np.arange(width) < lengths[:, None])).sum(axis=1)
+    
+    cycle = 0
+    while len(rows) > 0:
+        
+        # Window of every trace, starting at its head: wide enough for the instructions in flight plus the next
+        # ones in program order with in-order issue, or until num_units ready instructions are found (within the
+        # reorder buffer if there is one) with out-of-order issue
+        if mode == MODE_IN_ORDER:
+            span = int((num_issued + num_units - head).max()) + 1
+        else:
+            span = int((issued_end - head).max()) + num_units + 1
+            limit = lengths if rob_size is None else np.minimum(lengths, head + rob_size)
+        
+        while True:
+            offsets = np.arange(span)
+            columns = head[:, None] + offsets
+            inside = columns < lengths[:, None]
+            positions = row_starts + np.minimum(columns, width - 1)
+            window_issue = issue_cycles.ravel()[positions]
+            not_issued = inside & (window_issue == 0)
+            ready = not_issued & (num_predecessors.ravel()[positions] == 0)
+            if mode == MODE_IN_ORDER:
+                break
+            
+            # Widen the windows while a trace may have ready instructions that could issue past its window
+            if rob_size is not None:
+                ready &= columns < (head + rob_size)[:, None]
+            found = ready.sum(axis=1)
+            if not ((found < num_units) & (found < num_ready) & (head + span < limit)).any():
+                break
+            span *= 2
+        
+        # Issue up to num_units instructions per cycle
+        if mode == MODE_IN_ORDER:
+            
+            # Only the next instructions in program order, up to the first one that has to wait
+            blocked = (not_issued & ~ready) | ~inside
+            first_blocked = np.where(blocked.any(axis=1), np.argmax(blocked, axis=1), span)
+            issue_now = (offsets >= (num_issued - head)[:, None]) & (offsets < np.minimum(first_blocked, num_issued - head + num_units)[:, None])
+        else:
+            
+            # The ready instructions with the lowest program numbers
+            issue_now = ready & (np.cumsum(ready, axis=1) <= num_units)
+        
+        issue_cycles.ravel()[positions[issue_now]] = cycle + 1
+        window_issue[issue_now] = cycle + 1
+        issued = issue_now.sum(axis=1)
+        num_issued += issued
+        num_ready -= issued
+        issued_end = np.where(issued > 0, np.maximum(issued_end, head + span - np.argmax(issue_now[:, ::-1], axis=1)), issued_end)
+        
+        # Instructions issued at cycle c with latency L complete L cycles later, the windows always end with an
+        # instruction not completed since they go past the instructions issued before this cycle
+        completed = (window_issue > 0) & (window_issue - 1 + latencies.ravel()[positions] <= cycle)
+        
+        # Retire the completed instructions, only in program order unless out-of-order retirement is allowed
+        if mode == MODE_OOO_RETIREMENT:
+            not_retired = retire_cycles.ravel()[positions] == 0
+            retire_now = completed & not_retired
+            head += np.argmax(not_retired & ~retire_now, axis=1)
+        else:
+            new_head = np.argmax(~completed, axis=1)
+            retire_now = offsets < new_head[:, None]
+            head += new_head
+        
+        retired = positions[retire_now]
+        retire_cycles.ravel()[retired] = cycle + 1
+        num_retired += retire_now.sum(axis=1)
+        
+        # Release the successors of the retired instructions
+        if len(retired) > 0:
+            starts = successor_starts.ravel()[retired]
+            counts = successor_ends.ravel()[retired] - starts
+            total = int(counts.sum())
+            if total > 0:
+                targets = successor_targets[np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)]
+                released = np.repeat(retired - retired % width, counts) + targets
+                np.subtract.at(num_predecessors.ravel(), released, 1)
+                now_ready = released[num_predecessors.ravel()[released] == 0]
+                if len(now_ready) > 1:
+                    now_ready = np.unique(now_ready)
+                num_ready += np.bincount(now_ready // width, minlength=len(rows))
+        
+        # Update the cycle counter
+        cycle += 1
+        
+        # Save the results of the traces where all the instructions have retired, and drop them from the arrays
+        finished = num_retired == lengths
+        if finished.any():
+            issue_out[rows[finished]] = issue_cycles[finished]
+            retire_out[rows[finished]] = retire_cycles[finished]
+            num_cycles[rows[finished]] = cycle
+            
+            running = ~finished
+            rows = rows[running]
+            row_starts = np.arange(len(rows))[:, None] * width
+            lengths = lengths[running]
+            latencies = latencies[running]
+            num_predecessors = num_predecessors[running]
+            successor_starts = successor_starts[running]
+            successor_ends = successor_ends[running]
+            issue_cycles = issue_cycles[running]
+            retire_cycles = retire_cycles[running]
+            head = head[running]
+            num_issued = num_issued[running]
+            issued_end = issued_end[running]
+            num_retired = num_retired[running]
+            num_ready = num_ready[running]
+    
+    return issue_out, retire_out, num_cycles
+
+# Function to identify the trace of a run in its checkpoints: path, size and modification time of a trace file
+# (which may be streamed), or the digest of the parsed instructions
+def trace_identity(trace, instructions):
+    if isinstance(trace, str):
+        status = os.stat(trace)
+        return (os.path.abspath(trace), status.st_size, status.st_mtime_ns)
+    return instructions.digest
+
+# Totals of a simulation run in summary mode
+SimulationSummary = namedtuple('SimulationSummary', ['mode', 'num_units', 'num_instructions', 'cycles', 'ipc', 'utilization',
+                                                     'average_latency', 'stalls', 'phase_times', 'unit_usage'], defaults=(None, None, None))
+
+# Function to build the cache key of a simulation: hash of the trace contents and the full scheduler configuration
+def cache_key(trace, mode, num_units, rob_size=None, engine=ENGINE_EVENT, physical_registers=None, count_stalls=False, issue_window=None,
+              unit_pools=None, architectural_registers=None):
+    unit_pools = None if unit_pools is None else sorted(unit_pools.items())
+    configuration = repr((ENGINE_VERSION, trace.digest, mode, num_units, rob_size, engine, physical_registers, count_stalls, issue_window,
+                          unit_pools, architectural_registers))
+    return hashlib.sha256(configuration.encode()).hexdigest()
+
+# Function to simulate a trace without user interaction
+# trace is the name of an input file, a parsed trace or a list of instructions, mode is one of MODES and
+# engine one of ENGINES. A parsed trace can be simulated any number of times, it is not modified.
+# rob_size limits the instructions that have not retired yet, the cycle-by-cycle and batch engines only support
+# it for out-of-order issue, in-order retirement (ValueError in the other modes). physical_registers enables register renaming (onto
+# architectural_registers architectural registers, by default NUM_REGISTERS or the registers the trace uses if it
+# uses more), count_stalls
+# classifies the lost issue slots (SimulationResult.stalls), time_phases times the dispatch, issue and retire
+# phases (SimulationResult.phase_times) and observer gets the events as they happen; only the event-driven
+# engine supports them. issue_window limits the instructions waiting to be issued in the out-of-order modes
+# (in-order issue only ever looks at the next instruction), the batch engine does not support it. unit_pools gives
+# each class of operations its own pool of functional units (see FunctionalUnitPool), with num_units as the issue
+# width, and reports the usage of each pool (SimulationResult.unit_usage); only the event-driven engine supports it.
+# summary only keeps the totals of the run and returns a SimulationSummary, without any per-cycle data. The
+# event-driven engine then streams a trace file instead of reading it, keeping at most rob_size instructions.
+# cache is a ResultCache (see ISRR_cache.py): cached results are returned without running any scheduler, and
+# new results are saved in it (with their events unless in summary mode). Runs with an observer or timed
+# phases always run.
+# checkpoint_path saves the state of the event-driven engine every checkpoint_interval cycles; if the file
+# already exists, the run resumes from it (with num_units and rob_size for the rest of the run). The checkpoint
+# only resumes a run on the same trace (same file, size and modification time, or same instructions) with the
+# same other settings, and it is deleted once the run completes.
+# sampling estimates the cycles from periodic samples instead (see sampled_execution) and returns a SampledSummary.
+def simulate(trace, mode, num_units, rob_size=None, engine=ENGINE_EVENT, physical_registers=None,
+             count_stalls=False, time_phases=False, observer=None, summary=False, cache=None,
+             checkpoint_path=None, checkpoint_interval=100000,
+             sampling=False, sample_period=100000, sample_size=1000, warmup=1000, issue_window=None,
+             unit_pools=None, architectural_registers=None):
+    
+    # Read the instructions, the cache needs the whole trace to hash it
+    if isinstance(trace, str):
+        if sampling and engine == ENGINE_EVENT:
+            instructions = TraceFile(trace)
+        elif summary and engine == ENGINE_EVENT and cache is None:
+            instructions = iter_instructions_from_file(trace)
+        else:
+            instructions = ParsedTrace.from_file(trace)
+    else:
+        instructions = as_parsed_trace(trace)
+    
+    if mode not in MODES:
+        raise ValueError(f"Invalid mode {mode!r}, expected one of {', '.join(MODES)}")
+    if engine not in ENGINES:
+        raise ValueError(f"Invalid engine {engine!r}, expected one of {', '.join(ENGINES)}")
+    if num_units < 1:
+        raise ValueError("The number of functional units must be at least 1")
+    if rob_size is not None and engine != ENGINE_EVENT and mode != MODE_OOO_IN_ORDER_RETIREMENT:
+        raise ValueError("The cycle-by-cycle and batch engines only support a reorder buffer size for out-of-order issue, in-order retirement")
+    if physical_registers is not None and engine != ENGINE_EVENT:
+        raise ValueError("Register renaming is only supported by the event-driven engine")
+    if architectural_registers is not None and physical_registers is None:
+        raise ValueError("The number of architectural registers is only used by register renaming")
+    
+    # A streamed trace file is read once more to count its registers
+    if physical_registers is not None and architectural_registers is None and isinstance(trace, str) and not isinstance(instructions, ParsedTrace):
+        architectural_registers = max(NUM_REGISTERS, count_registers(iter_instructions_from_file(trace)))
+    if (count_stalls or time_phases or observer is not None) and engine != ENGINE_EVENT:
+        raise ValueError("Stall counting, phase timing and observers are only supported by the event-driven engine")
+    if checkpoint_path is not None and engine != ENGINE_EVENT:
+        raise ValueError("Checkpoints are only supported by the event-driven engine")
+    if checkpoint_path is not None and checkpoint_interval < 1:
+        raise ValueError("The checkpoint interval must be at least 1 cycle")
+    if issue_window is not None and issue_window < 1:
+        raise ValueError("The issue window size must be at least 1")
+    if issue_window is not None and engine == ENGINE_BATCH:
+        raise ValueError("The issue window is not supported by the batch engine")
+    if unit_pools is not None and engine != ENGINE_EVENT:
+        raise ValueError("Functional unit pools are only supported by the event-driven engine")
+    
+    # Estimate the cycles from samples of the trace
+    if sampling:
+        if (engine != ENGINE_EVENT or physical_registers is not None or count_stalls or time_phases or observer is not None
+                or checkpoint_path is not None or issue_window is not None or unit_pools is not None):
+            raise ValueError("Sampled runs only support the event-driven engine without other options")
+        return sampled_execution(instructions, num_units, mode, rob_size, sample_period, sample_size, warmup)
+    
+    # Look for the result in the cache
+    key = None
+    if cache is not None and observer is None and not time_phases:
+        key = cache_key(instructions, mode, num_units, rob_size, engine, physical_registers, count_stalls, issue_window, unit_pools,
+                        architectural_registers)
+        entry = cache.get(key, events=not summary)
+        if entry is not None:
+            totals, events = entry
+            if summary:
+                return SimulationSummary(mode, num_units, totals['num_instructions'], totals['cycles'], totals['ipc'],
+                                         totals['utilization'], totals['average_latency'], totals['stalls'], unit_usage=totals.get('unit_usage'))
+            return SimulationResult(instructions, mode, num_units, ScheduleTrace.from_bytes(events, totals['cycles']), totals['stalls'],
+                                    unit_usage=totals.get('unit_usage'))
+    
+    # Call the scheduler
+    stalls = phase_times = unit_usage = None
+    if engine == ENGINE_EVENT:
+        
+        # Resume from the checkpoint if there is one
+        schedule = checkpoint_settings = None
+        if checkpoint_path is not None:
+            checkpoint_settings = (trace_identity(trace, instructions), mode, physical_registers, count_stalls, issue_window,
+                                   None if unit_pools is None else sorted(unit_pools.items()), summary, architectural_registers)
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            scheduler, schedule = load_checkpoint(checkpoint_path, instructions, num_units, rob_size, observer, checkpoint_settings)
+        else:
+            scheduler = EventDrivenScheduler(instructions, num_units, mode, rob_size, physical_registers, count_stalls, time_phases, observer,
+                                             issue_window, unit_pools, architectural_registers)
+        
+        if summary:
+            schedule = summarize_schedule(scheduler, schedule, checkpoint_path, checkpoint_interval, checkpoint_settings)
+        else:
+            schedule = record_schedule(scheduler, len(instructions), schedule, checkpoint_path, checkpoint_interval, checkpoint_settings)
+        
+        # The run is complete, its checkpoint must not be resumed by a later run
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        stalls, phase_times = scheduler.stalls, scheduler.phase_times
+        if scheduler.unit_pools is not None:
+            unit_usage = scheduler.unit_usage(schedule.num_cycles)
+    elif engine == ENGINE_BATCH:
+        batch = batch_execution([instructions], num_units, mode, rob_size)
+        schedule = batch.summary(0) if summary else batch.to_trace(0)
+    elif mode == MODE_IN_ORDER:
+        schedule = in_order_execution(instructions, num_units, as_trace=True, summary=summary)
+    elif mode == MODE_OOO_IN_ORDER_RETIREMENT:
+        schedule = out_of_order_issue_in_order_retirement(instructions, num_units, rob_size, as_trace=True, summary=summary,
+                                                          issue_window=issue_window)
+    else:
+        schedule = out_of_order_issue_and_retirement(instructions, num_units, as_trace=True, summary=summary, issue_window=issue_window)
+    
+    # Save the result in the cache
+    if key is not None:
+        totals = schedule if summary else schedule.summarize(num_units)
+        cache.put(key, {'num_instructions': totals.num_retired, 'cycles': totals.num_cycles, 'ipc': totals.ipc,
+                        'utilization': totals.utilization, 'average_latency': totals.average_latency, 'stalls': stalls,
+                        'unit_usage': unit_usage},
+                  None if summary else schedule.to_bytes())
+    
+    if summary:
+        return SimulationSummary(mode, num_units, schedule.num_retired, schedule.num_cycles, schedule.ipc,
+                                 schedule.utilization, schedule.average_latency, stalls, phase_times, unit_usage)
+    return SimulationResult(instructions, mode, num_units, schedule, stalls, phase_times, unit_usage)
+
+# Function to simulate many traces with the same settings using the batch engine, returns a SimulationResult
+# (or a SimulationSummary in summary mode) for each trace
+def simulate_batch(traces, mode, num_units, rob_size=None, summary=False):
+    
+    # Read the instructions
+    traces = [ParsedTrace.from_file(trace) if isinstance(trace, str) else as_parsed_trace(trace) for trace in traces]
+    
+    if num_units < 1:
+        raise ValueError("The number of functional units must be at least 1")
+    
+    batch = batch_execution(traces, num_units, mode, rob_size)
+    if summary:
+        return [SimulationSummary(mode, num_units, s.num_retired, s.num_cycles, s.ipc, s.utilization, s.average_latency)
+                for s in (batch.summary(i) for i in range(len(batch)))]
+    return batch.results()
+
+# Summary of one configuration of a sweep
+SweepResult = namedtuple('SweepResult', ['trace', 'mode', 'num_units', 'instructions', 'cycles', 'ipc'])
+
+# Parsed traces kept by each sweep worker, the least recently used ones are dropped first
+# The configurations are submitted trace by trace, so a few traces are enough to parse each one once.
+SWEEP_TRACE_CACHE_SIZE = 8
+
+# Parsed traces (least recently used first) and result cache of the current worker process
+_worker_traces = OrderedDict()
+_worker_cache = None
+
+# Function to simulate one configuration of a sweep in a worker process
+# Each process has its own copy of the scheduler state, only the summary is sent back
+def _sweep_worker(trace, mode, num_units, rob_size, engine, physical_registers=None, cache_path=None, cache_size=None, issue_window=None,
+                  unit_pools=None, architectural_registers=None):
+    global _worker_cache
+    
+    # Parse each trace once per process, keeping the latest ones only
+    instructions = _worker_traces.get(trace)
+    if instructions is None:
+        instructions = _worker_traces[trace] = ParsedTrace.from_file(trace)
+        while len(_worker_traces) > SWEEP_TRACE_CACHE_SIZE:
+            _worker_traces.popitem(last=False)
+    else:
+        _worker_traces.move_to_end(trace)
+    
+    # Open the result cache once per process
+    if cache_path is not None and _worker_cache is None:
+        from ISRR_cache import DEFAULT_MAX_BYTES, ResultCache
+        _worker_cache = ResultCache(cache_path, DEFAULT_MAX_BYTES if cache_size is None else cache_size)
+    
+    result = simulate(instructions, mode, num_units, rob_size, engine, physical_registers, summary=True, cache=_worker_cache,
+                      issue_window=issue_window, unit_pools=unit_pools, architectural_registers=architectural_registers)
+    return SweepResult(trace, mode, num_units, result.num_instructions, result.cycles, result.ipc)
+
+# Function to simulate every combination of traces, modes and numbers of functional units on a pool of processes
+# Yields a SweepResult for each configuration as soon as it finishes, jobs defaults to the number of cores.
+# With cache_path, the workers share a result cache in that file (cache_size bytes at most).
+def sweep(traces, modes, units, rob_size=None, engine=ENGINE_EVENT, jobs=None, physical_registers=None, cache_path=None, cache_size=None,
+          issue_window=None, unit_pools=None, architectural_registers=None):
+    
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_sweep_worker, trace, mode, num_units, rob_size, engine, physical_registers, cache_path, cache_size, issue_window,
+                                   unit_pools, architectural_registers)
+                   for trace in traces for mode in modes for num_units in units]
+        
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        
+        # Don't start the remaining configurations if the caller stops early
+        finally:
+            for future in futures:
+                future.cancel()
+
+# Function to build a summary table of the results of a sweep
+def sweep_to_dataframe(results):
+    import pandas as pd
+    
+    df = pd.DataFrame(list(results), columns=SweepResult._fields)
+    return df.sort_values(['trace', 'mode', 'num_units'], ignore_index=True)
+
+# Function to print a summary line
+def print_summary_line(trace, mode, num_units, instructions, cycles, ipc):
+    print(f"{trace:<30} {mode:<24} {num_units:>5} {instructions:>12} {cycles:>8} {ipc:>6.3f}")
+
+# Function to print the issue slots lost by reason, as a share of all the issue slots
+# The structural stalls count ready instructions instead of issue slots, so they have no share
+def print_stalls(stalls, num_slots):
+    print('    ' + '  '.join(f"{reason} {count}" if reason == STALL_STRUCTURAL else f"{reason} {count} ({count / num_slots:.1%})"
+                              for reason, count in stalls.items()))
+
+# Function to print the lower bound of the cycles of a run and how far the run is from it
+def print_bound_gap(cycles, bound):
+    gap = cycles / bound.cycles if bound.cycles > 0 else 1.0
+    print(f"    lower bound {bound.cycles} cycles (critical path {bound.critical_path}, resources {bound.resource_bound}), "
+          f"{cycles - bound.cycles} cycles above it ({gap:.2f}x)")
+
+# Function to print the usage of each functional unit pool
+# The blocked count adds up, over the cycles, the ready instructions left without a unit of the pool
+def print_unit_usage(unit_usage):
+    print('    ' + '  '.join(f"{unit_class} x{usage['count']}: {usage['issued']} issued, {usage['utilization']:.1%} busy, {usage['blocked']} blocked"
+                              for unit_class, usage in unit_usage.items()))
+
+# Function to run every combination of traces, modes and number of functional units from the command line
+def run_batch(args):
+    
+    # Analyze each trace once, streaming it, to get the lower bounds of the cycles
+    analyses = None
+    if args.analyze or args.bound:
+        analyses = {trace: analyze_trace(iter_instructions_from_file(trace)) for trace in args.traces}
+    
+    # Only print the lower bounds, without simulating
+    if args.analyze:
+        print(f"{'Trace':<30} {'Units':>5} {'Instructions':>12} {'Critical path':>13} {'Resource':>8} {'Bound':>8} {'IPC':>6}")
+        for trace in args.traces:
+            for num_units in args.units:
+                bound = cycle_lower_bound(analyses[trace], num_units)
+                print(f"{trace:<30} {num_units:>5} {analyses[trace].num_instructions:>12} {bound.critical_path:>13} {bound.resource_bound:>8} "
+                      f"{bound.cycles:>8} {bound.ipc:>6.3f}")
+        return
+    
+    print(f"{'Trace':<30} {'Mode':<24} {'Units':>5} {'Instructions':>12} {'Cycles':>8} {'IPC':>6}")
+    
+    # Spread the configurations over a pool of processes, printing them as they finish
+    if args.jobs != 1:
+        for result in sweep(args.traces, args.modes, args.units, args.rob_size, args.engine, args.jobs, args.physical_registers,
+                            args.cache, args.cache_size * 1024 * 1024, args.issue_window, args.unit_pools, args.architectural_registers):
+            print_summary_line(*result)
+            if analyses is not None:
+                print_bound_gap(result.cycles, cycle_lower_bound(analyses[result.trace], result.num_units))
+        return
+    
+    # Simulate all the traces of each configuration together
+    if args.engine == ENGINE_BATCH:
+        traces = [ParsedTrace.from_file(trace) for trace in args.traces]
+        results = {}
+        for mode in args.modes:
+            for num_units in args.units:
+                for trace, result in zip(args.traces, simulate_batch(traces, mode, num_units, args.rob_size, not args.table)):
+                    results[trace, mode, num_units] = result
+        
+        for trace in args.traces:
+            for mode in args.modes:
+                for num_units in args.units:
+                    result = results[trace, mode, num_units]
+                    print_summary_line(trace, mode, num_units, result.num_instructions, result.cycles, result.ipc)
+                    if analyses is not None:
+                        print_bound_gap(result.cycles, cycle_lower_bound(analyses[trace], num_units))
+                    if args.table:
+                        print(result.to_dataframe())
+        return
+    
+    # Open the result cache
+    cache = None
+    if args.cache is not None:
+        from ISRR_cache import ResultCache
+        cache = ResultCache(args.cache, args.cache_size * 1024 * 1024)
+    
+    # Estimate the cycles of each configuration from samples, streaming the traces
+    if args.sample:
+        for trace in args.traces:
+            for mode in args.modes:
+                for num_units in args.units:
+                    result = simulate(trace, mode, num_units, args.rob_size, sampling=True, sample_period=args.sample_period,
+                                      sample_size=args.sample_size, warmup=args.warmup)
+                    print_summary_line(trace, mode, num_units, result.num_instructions, round(result.cycles), result.ipc)
+                    if analyses is not None:
+                        print_bound_gap(round(result.cycles), cycle_lower_bound(analyses[trace], num_units))
+                    if result.num_samples == 0:
+                        print("    Trace too short to sample, simulated in full")
+                        continue
+                    print(f"    {result.num_samples} samples, {result.confidence:.0%} interval: cycles {result.cycles_low:.0f}-{result.cycles_high:.0f}, "
+                          f"IPC {result.ipc_low:.3f}-{result.ipc_high:.3f}")
+        return
+    
+    for trace in args.traces:
+        
+        # Parse each trace once, unless the event-driven engine writes the schedule out: then the trace is streamed
+        instructions = trace if args.output is not None and args.engine == ENGINE_EVENT else ParsedTrace.from_file(trace)
+        
+        for mode in args.modes:
+            for num_units in args.units:
+                
+                # Write the schedule to a file as it is produced, the other engines replay it once it is done
+                sink = None
+                if args.output is not None:
+                    sink = open_sink(output_path(args.output, trace, mode, num_units), args.output_rows)
+                
+                try:
+                    result = simulate(instructions, mode, num_units, args.rob_size, args.engine, args.physical_registers, args.stalls,
+                                      observer=sink if args.engine == ENGINE_EVENT else None,
+                                      summary=not args.table and (sink is None or args.engine == ENGINE_EVENT), cache=cache,
+                                      issue_window=args.issue_window, unit_pools=args.unit_pools,
+                                      architectural_registers=args.architectural_registers)
+                    if sink is not None and args.engine != ENGINE_EVENT:
+                        result.trace.replay(sink)
+                finally:
+                    if sink is not None:
+                        sink.close()
+                print_summary_line(trace, mode, num_units, result.num_instructions, result.cycles, result.ipc)
+                
+                # Print how far the run is from the lower bound if requested
+                if analyses is not None:
+                    print_bound_gap(result.cycles, cycle_lower_bound(analyses[trace], num_units))
+                
+                # Print the lost issue slots by reason if requested
+                if args.stalls:
+                    print_stalls(result.stalls, result.cycles * num_units)
+                
+                # Print the usage of the functional unit pools
+                if args.unit_pools is not None:
+                    print_unit_usage(result.unit_usage)
+                
+                # Print the table of every cycle if requested
+                if args.table:
+                    print(result.to_dataframe())
+
+# Function to get the output file of a configuration from a template such as out/{trace}_{mode}_{units}.csv
+def output_path(template, trace, mode, num_units):
+    return template.format(trace=os.path.splitext(os.path.basename(trace))[0], mode=mode, units=num_units)
+
+# Function to parse a number or an inclusive range of numbers such as 1-16
+def parse_range(text):
+    try:
+        if '-' in text:
+            first, last = text.split('-', 1)
+            return list(range(int(first), int(last) + 1))
+        return [int(text)]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number or range: {text!r}")
+
+# Function to parse functional unit pools such as alu:2,mul:1:4:unpipelined,mem:2:3
+# Each pool is class:count[:latency[:pipelined|unpipelined]], an empty latency keeps the latency of the operations
+def parse_unit_pools(text):
+    unit_pools = {}
+    try:
+        for part in text.split(','):
+            fields = part.split(':')
+            if len(fields) < 2 or len(fields) > 4 or fields[0] not in UNIT_CLASSES or fields[0] in unit_pools:
+                raise ValueError
+            latency = int(fields[2]) if len(fields) > 2 and fields[2] else None
+            if len(fields) == 4 and fields[3] not in ('pipelined', 'unpipelined'):
+                raise ValueError
+            unit_pools[fields[0]] = FunctionalUnitPool(int(fields[1]), latency, len(fields) < 4 or fields[3] == 'pipelined')
+        check_unit_pools(unit_pools)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid functional unit pools: {text!r}")
+    return unit_pools
+
+# Function to parse the command line arguments of the batch mode
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description="Multi-Issue Processor Simulator. Without arguments, the interactive menus are shown.")
+    parser.add_argument('traces', nargs='+', help="input files with one instruction per line (rD,rS1,rS2,op)")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help="processor modes to simulate (default: all)")
+    parser.add_argument('--units', nargs='+', type=parse_range, default=[[1]], help="numbers of parallel functional units, or ranges such as 1-16 (default: 1)")
+    parser.add_argument('--rob-size', type=int, default=None, help="maximum number of instructions not retired yet (default: unlimited)")
+    parser.add_argument('--issue-window', type=int, default=None, help="maximum number of instructions waiting to be issued, out-of-order modes (default: unlimited)")
+    parser.add_argument('--unit-pools', type=parse_unit_pools, default=None,
+                        help="functional unit pools by class, such as alu:2,mul:1:4:unpipelined,mem:2 (event engine only, default: num_units generic units)")
+    parser.add_argument('--physical-registers', type=int, default=None, help="rename the registers onto this many physical registers (event engine only, default: no renaming)")
+    parser.add_argument('--architectural-registers', type=int, default=None,
+                        help=f"architectural registers renamed by --physical-registers (default: {NUM_REGISTERS}, or the registers used by the trace if more)")
+    parser.add_argument('--engine', choices=ENGINES, default=ENGINE_EVENT, help="scheduling engine (default: event)")
+    parser.add_argument('--stalls', action='store_true', help="print the issue slots lost by reason (event engine only)")
+    parser.add_argument('--analyze', action='store_true', help="only print the lower bound of the cycles of each trace and number of units, without simulating")
+    parser.add_argument('--bound', action='store_true', help="print the lower bound of the cycles and the gap to it after each run")
+    parser.add_argument('--table', action='store_true', help="print the table of every cycle (requires pandas)")
+    parser.add_argument('--output', default=None,
+                        help="write the schedule of each run to this file (.csv, .jsonl, .parquet or .arrow), {trace}, {mode} and {units} "
+                             "are replaced by the configuration (default: no output)")
+    parser.add_argument('--output-rows', choices=SINK_ROWS, default=SINK_EVENTS, help="write one row per event or per cycle (default: events)")
+    parser.add_argument('--jobs', type=int, default=1, help="number of worker processes, 0 for one per core (default: 1)")
+    parser.add_argument('--sample', action='store_true', help="estimate the cycles from periodic samples instead of a full run (event engine only)")
+    parser.add_argument('--sample-period', type=int, default=100000, help="instructions between the starts of two samples (default: 100000)")
+    parser.add_argument('--sample-size', type=int, default=1000, help="instructions measured in each sample (default: 1000)")
+    parser.add_argument('--warmup', type=int, default=1000, help="instructions simulated before and after each sample (default: 1000)")
+    parser.add_argument('--cache', default=None, help="SQLite file to cache the results in (default: no cache)")
+    parser.add_argument('--cache-size', type=int, default=256, help="size cap of the cache in megabytes (default: 256)")
+    
+    args = parser.parse_args(argv)
+    args.units = [num_units for numbers in args.units for num_units in numbers]
+    if args.jobs == 0:
+        args.jobs = None
+    
+    if any(num_units < 1 for num_units in args.units):
+        parser.error("the number of functional units must be at least 1")
+    if args.rob_size is not None and args.rob_size < 1:
+        parser.error("the reorder buffer size must be at least 1")
+    if args.rob_size is not None and args.engine != ENGINE_EVENT and any(mode != MODE_OOO_IN_ORDER_RETIREMENT for mode in args.modes):
+        parser.error(f"with the {args.engine} engine, --rob-size only applies to --modes {MODE_OOO_IN_ORDER_RETIREMENT}")
+    if args.issue_window is not None:
+        if args.issue_window < 1:
+            parser.error("the issue window size must be at least 1")
+        if args.engine == ENGINE_BATCH:
+            parser.error("--issue-window can't be used with the batch engine")
+    if args.unit_pools is not None and args.engine != ENGINE_EVENT:
+        parser.error("--unit-pools requires the event engine")
+    if (args.analyze or args.bound) and args.unit_pools is not None and any(pool.latency is not None for pool in args.unit_pools.values()):
+        parser.error("the lower bound uses the default latencies, it can't be used with unit pool latencies")
+    if args.physical_registers is not None:
+        if args.engine != ENGINE_EVENT:
+            parser.error("--physical-registers requires the event engine")
+        num_architectural = NUM_REGISTERS if args.architectural_registers is None else args.architectural_registers
+        if args.physical_registers <= num_architectural:
+            parser.error(f"the number of physical registers must be greater than the number of architectural registers ({num_architectural})")
+    if args.architectural_registers is not None:
+        if args.physical_registers is None:
+            parser.error("--architectural-registers requires --physical-registers")
+        if args.architectural_registers < 1:
+            parser.error("the number of architectural registers must be at least 1")
+    if args.jobs is not None and args.jobs < 0:
+        parser.error("the number of jobs can't be negative")
+    if args.table and args.jobs != 1:
+        parser.error("--table can't be used with more than one job")
+    if args.stalls and (args.jobs != 1 or args.engine != ENGINE_EVENT):
+        parser.error("--stalls requires the event engine and one job")
+    if args.sample:
+        if (args.engine != ENGINE_EVENT or args.jobs != 1 or args.table or args.stalls or args.physical_registers is not None
+                or args.cache is not None or args.issue_window is not None or args.unit_pools is not None):
+            parser.error("--sample requires the event engine and one job, without --table, --stalls, --physical-registers, --issue-window, "
+                         "--unit-pools or --cache")
+        if args.sample_size < 1 or args.warmup < 0 or args.sample_period < 2 * args.warmup + args.sample_size:
+            parser.error("the sample period must fit the sample size and twice the warmup")
+    if args.output is not None:
+        if args.engine == ENGINE_BATCH or args.jobs != 1 or args.sample or args.analyze:
+            parser.error("--output requires the event or cycle engine and one job, without --sample or --analyze")
+        extension = os.path.splitext(args.output)[1].lower()
+        if extension not in SINK_FORMATS:
+            parser.error(f"the output format must be one of {', '.join(SINK_FORMATS)}")
+        if extension in ('.parquet', '.arrow'):
+            try:
+                import pyarrow
+            except ImportError:
+                parser.error(f"{extension} output requires pyarrow")
+        try:
+            paths = {output_path(args.output, trace, mode, num_units) for trace in args.traces for mode in args.modes for num_units in args.units}
+        except (KeyError, IndexError, ValueError):
+            parser.error("the output file can only use the {trace}, {mode} and {units} fields")
+        if len(paths) < len(args.traces) * len(args.modes) * len(args.units):
+            parser.error("the output file needs {trace}, {mode} and {units} fields to write several configurations")
+    if args.cache is not None and args.engine == ENGINE_BATCH:
+        parser.error("--cache can't be used with the batch engine")
+    if args.cache_size < 0:
+        parser.error("the size of the cache can't be negative")
+    
+    return args
+
+#############################################################################################################################       
+
+# Function to run the simulator with the interactive menus
+def run_interactive():
+    print("Multi-Issue Processor Simulator\n")
+
+    print("Select input file: \n")
+    print("1. input_1")
+    print("2. input_2")
+    print("3. input_1 (with_register renaming)")
+    print("4. input_2 (with_register renaming)")
+    print("\n")
+
+    # Ask for input file
+    input_file = 0
+
+    while input_file <= 0 or input_file > 4:
+        try:
+            input_file = int(input("Enter input file: "))
+        except ValueError:
+            print("Invalid input. Please enter a positive integer.")
+
+    # Initialize the instructions array
+    filename = ''
+    instructions = []
+
+    # Switch to select input file
+    match input_file:
+
+        # Read the instructions from the input file 1
+        case 1:
+            print("input_1")
+            filename = 'input_1.txt'
+            instructions = read_instructions_from_file(filename)
+
+        # Read the instructions from the input file 2
+        case 2:
+            print("input_2")
+            filename = 'input_2.txt'
+            instructions = read_instructions_from_file(filename)
+
+        # Read the instructions from the input file 3
+        case 3:
+            print("input_1 (with_register renaming)")
+            filename = 'input_3.txt'
+            instructions = read_instructions_from_file(filename)
+
+        # Read the instructions from the input file 4    
+        case 4:
+            print("input_2 (with_register renaming)")
+            filename = 'input_4.txt'
+            instructions = read_instructions_from_file(filename)
+
+        case _:
+            print("Invalid input. Please enter a positive integer.")
+
+    # Print the instructions
+    if len(instructions) > 0:
+        print_instructions(instructions)
+
+    # Ask for processor setting
+    print("\nSelect processor setting: \n")
+    print("1. Single instruction, in-order execution")
+    print("2. Superscalar, in-order execution")
+    print("3. Superscalar, out-of-order issue, in-order retirement")
+    print("4. Superscalar, out-of-order issue and retirement")
+    print("\n")
+
+    processor_setting = 0
+
+    while processor_setting <= 0 or processor_setting > 4:
+        try:
+            processor_setting = int(input("Enter processor setting: \n"))
+        except ValueError:
+            print("Invalid input. Please enter a positive integer.")
+
+    # Ask for scheduling engine
+    print("\nSelect scheduling engine: \n")
+    print("1. Cycle-by-cycle")
+    print("2. Event-driven (skips idle cycles)")
+    print("3. Streaming event-driven (reads the file lazily, bounded instruction window)")
+    print("\n")
+
+    engine = 0
+
+    while engine <= 0 or engine > 3:
+        try:
+            engine = int(input("Enter scheduling engine: \n"))
+        except ValueError:
+            print("Invalid input. Please enter a positive integer.")
+
+    # Ask for the instruction window size of the streaming engine
+    window_size = 0
+
+    while engine == 3 and window_size <= 0:
+        try:
+            window_size = int(input("Enter the instruction window size: "))
+        except ValueError:
+            print("Invalid input. Please enter a positive integer.")
+
+    # Switch to select processor setting
+    match processor_setting:
+
+        # Call function for single instruction, in-order execution
+        case 1:
+
+            print("Single instruction, in-order execution\n")
+
+            # Call function and print results
+            if engine == 3:
+                print_streaming_execution(iter_instructions_from_file(filename), 1, MODE_IN_ORDER, window_size)
+            elif engine == 2:
+                print(event_driven_execution(instructions, 1, MODE_IN_ORDER))
+            else:
+                print(in_order_execution(instructions, 1))
+
+        # Call function for superscalar, in-order execution        
+        case 2:
+
+            print("Superscalar, in-order execution\n")
+
+            # Ask for number of parallel functional units
+            num_units = 0
+
+            while num_units <= 0:
+                try:
+                    num_units = int(input("Enter the number of parallel functional units: "))
+                except ValueError:
+                    print("Invalid input. Please enter a positive integer.")
+
+            print("\n")
+
+            # Call function and print results
+            if engine == 3:
+                print_streaming_execution(iter_instructions_from_file(filename), num_units, MODE_IN_ORDER, window_size)
+            elif engine == 2:
+                print(event_driven_execution(instructions, num_units, MODE_IN_ORDER))
+            else:
+                print(in_order_execution(instructions, num_units))
+
+        # Call function for superscalar, out-of-order issue, in-order retirement
+        case 3:
+
+            print("Superscalar, out-of-order issue, in-order retirement")
+
+            # Ask for number of parallel functional units
+            num_units = 0
+
+            while num_units <= 0:
+                try:
+                    num_units = int(input("Enter the number of parallel functional units: "))
+                except ValueError:
+                    print("Invalid input. Please enter a positive integer.")
+
+            # Ask for the reorder buffer size
+            rob_size = -1
+
+            while engine != 3 and rob_size < 0:
+                try:
+                    rob_size = int(input("Enter the reorder buffer size (0 for unlimited): "))
+                except ValueError:
+                    print("Invalid input. Please enter a non-negative integer.")
+
+            if rob_size <= 0:
+                rob_size = None
+
+            print("\n")
+
+            # Call function and print results
+            if engine == 3:
+                print_streaming_execution(iter_instructions_from_file(filename), num_units, MODE_OOO_IN_ORDER_RETIREMENT, window_size)
+            elif engine == 2:
+                print(event_driven_execution(instructions, num_units, MODE_OOO_IN_ORDER_RETIREMENT, rob_size))
+            else:
+                print(out_of_order_issue_in_order_retirement(instructions, num_units, rob_size))
+
+        # Call function for superscalar, out-of-order issue and retirement
+        case 4:
+
+            print("Superscalar, out-of-order issue and retirement")
+
+            # Ask for number of parallel functional units
+            num_units = 0
+
+            while num_units <= 0:
+                try:
+                    num_units = int(input("Enter the number of parallel functional units: "))
+                except ValueError:
+                    print("Invalid input. Please enter a positive integer.")
+
+            print("\n")
+
+            # Call function and print results
+            if engine == 3:
+                print_streaming_execution(iter_instructions_from_file(filename), num_units, MODE_OOO_RETIREMENT, window_size)
+            elif engine == 2:
+                print(event_driven_execution(instructions, num_units, MODE_OOO_RETIREMENT))
+            else:
+                print(out_of_order_issue_and_retirement(instructions, num_units))
+
+        case _:
+
+            print("Invalid input. Please enter a positive integer.")
+
+# Start of program
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    # Run in batch mode if traces are given, otherwise ask the user
+    # Settings that only turn out invalid for a trace are reported like the command line errors
+    if argv:
+        args = parse_arguments(argv)
+        try:
+            run_batch(args)
+        except ValueError as error:
+            sys.exit(f"{os.path.basename(sys.argv[0])}: error: {error}")
+    else:
+        run_interactive()
+
+if __name__ == '__main__':
+    main()
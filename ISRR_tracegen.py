@@ -0,0 +1,121 @@
+# Synthetic trace generator for the Multi-Issue Processor Simulator
+
+"""
+Program to generate synthetic instruction traces in the input format of ISRR_simulator.py:
+    
+    <destination register>,<source register 1>,<source register 2>,<operation>
+
+The traces are deterministic for a given seed. The generator controls:
+    o	Length: number of instructions (from a few to millions, written one line at a time)
+    o	Operation mix: relative weight of +, -, *, Load and Store
+    o	Register count: registers r0 to r<count - 1>
+    o	Dependency distance: average number of instructions between a source and the
+        instruction that wrote it (0 for independent sources)
+
+Usage:
+    python ISRR_tracegen.py trace.txt --length 100000 --seed 1 --mix +:3,-:1,*:2,Load:1,Store:1 --registers 14 --distance 4
+"""
+import argparse
+import math
+import random
+
+from ISRR_simulator import Instruction, NUM_REGISTERS, OPCODE_SYMBOLS, SYMBOL_OPCODES
+
+# Default operation mix (relative weights)
+DEFAULT_MIX = {'+': 3, '-': 1, '*': 2, 'Load': 1, 'Store': 1}
+
+# Function to generate a trace, yielding one instruction at a time
+# mix maps the operation symbols to their relative weights. Each source reads the destination of the
+# instruction dependency_distance instructions back on average (geometric distribution), or a random
+# register when there is no such instruction or dependency_distance is 0.
+def generate_trace(length, seed=0, mix=None, num_registers=NUM_REGISTERS, dependency_distance=4):
+    
+    if length < 0:
+        raise ValueError("The length can't be negative")
+    if num_registers < 1:
+        raise ValueError("The number of registers must be at least 1")
+    if dependency_distance < 0:
+        raise ValueError("The dependency distance can't be negative")
+    
+    if mix is None:
+        mix = DEFAULT_MIX
+    for symbol in mix:
+        if symbol not in SYMBOL_OPCODES:
+            raise ValueError(f"Invalid operation {symbol!r}, expected one of {', '.join(SYMBOL_OPCODES)}")
+    opcodes = [SYMBOL_OPCODES[symbol] for symbol in mix]
+    weights = list(mix.values())
+    
+    rng = random.Random(seed)
+    
+    # Destinations of the last instructions, so memory does not grow with the length
+    history = [0] * max(1, int(8 * dependency_distance))
+    if dependency_distance > 1:
+        log_continue = math.log(1 - 1 / dependency_distance)
+    
+    for k in range(length):
+        
+        # Pick the sources among the destinations of the previous instructions
+        sources = []
+        for s in range(2):
+            if dependency_distance > 0:
+                distance = 1 if dependency_distance <= 1 else min(1 + int(math.log(1 - rng.random()) / log_continue), len(history))
+                if distance <= k:
+                    sources.append(history[(k - distance) % len(history)])
+                    continue
+            sources.append(rng.randrange(num_registers))
+        
+        destination = rng.randrange(num_registers)
+        history[k % len(history)] = destination
+        
+        yield Instruction(destination, sources[0], sources[1], rng.choices(opcodes, weights)[0])
+
+# Function to format an instruction as a line of an input file
+def format_line(instruction):
+    return f"r{instruction.destination},r{instruction.source_1},r{instruction.source_2},{OPCODE_SYMBOLS[instruction.opcode]}"
+
+# Function to write a generated trace to a file, one line at a time
+def write_trace(filename, length, seed=0, mix=None, num_registers=NUM_REGISTERS, dependency_distance=4):
+    with open(filename, 'w') as file:
+        for instruction in generate_trace(length, seed, mix, num_registers, dependency_distance):
+            file.write(format_line(instruction) + '\n')
+
+# Function to parse an operation mix such as +:3,-:1,*:2,Load:1,Store:1
+def parse_mix(text):
+    mix = {}
+    try:
+        for part in text.split(','):
+            symbol, weight = part.rsplit(':', 1)
+            mix[symbol] = float(weight)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid operation mix: {text!r}")
+    
+    if any(symbol not in SYMBOL_OPCODES for symbol in mix) or any(weight < 0 for weight in mix.values()) or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError(f"invalid operation mix: {text!r}")
+    return mix
+
+# Function to parse the command line arguments
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description="Generate a synthetic trace for the Multi-Issue Processor Simulator.")
+    parser.add_argument('output', help="file to write the trace to")
+    parser.add_argument('--length', type=int, default=1000, help="number of instructions (default: 1000)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help="relative weight of each operation (default: +:3,-:1,*:2,Load:1,Store:1)")
+    parser.add_argument('--registers', type=int, default=NUM_REGISTERS, help=f"number of registers (default: {NUM_REGISTERS})")
+    parser.add_argument('--distance', type=float, default=4, help="average dependency distance, 0 for independent sources (default: 4)")
+    
+    args = parser.parse_args(argv)
+    if args.length < 0:
+        parser.error("the length can't be negative")
+    if args.registers < 1:
+        parser.error("the number of registers must be at least 1")
+    if args.distance < 0:
+        parser.error("the dependency distance can't be negative")
+    
+    return args
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    write_trace(args.output, args.length, args.seed, args.mix, args.registers, args.distance)
+
+if __name__ == '__main__':
+    main()
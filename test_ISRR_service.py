@@ -0,0 +1,40 @@
+# Tests of the simulation service
+
+import os
+import tempfile
+import threading
+import unittest
+
+from ISRR_service import JOB_CANCELLED, SimulationService
+from ISRR_tracegen import write_trace
+
+class SimulationServiceTest(unittest.TestCase):
+    
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.trace = os.path.join(directory.name, 'trace.txt')
+        write_trace(self.trace, 20000, seed=1)
+        
+        self.service = SimulationService(jobs=1)
+        self.addCleanup(self.service.shutdown)
+    
+    # Cancelling a job still waiting in the queue must not block the service
+    def test_cancel_pending_job(self):
+        jobs = [self.service.submit({'trace': self.trace, 'mode': 'ooo_retirement', 'units': 2}) for j in range(8)]
+        
+        cancel = threading.Thread(target=self.service.cancel, args=(jobs[-1].id,), daemon=True)
+        cancel.start()
+        cancel.join(10)
+        self.assertFalse(cancel.is_alive(), "cancel blocked")
+        
+        listing = threading.Thread(target=self.service.list, daemon=True)
+        listing.start()
+        listing.join(10)
+        self.assertFalse(listing.is_alive(), "list blocked after a cancel")
+        
+        self.assertEqual(self.service.get(jobs[-1].id).to_dict()['state'], JOB_CANCELLED)
+        self.assertTrue(jobs[-1].future.cancelled())
+
+if __name__ == '__main__':
+    unittest.main()